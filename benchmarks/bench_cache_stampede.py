@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+缓存击穿基准 (dreamecho.cache.Cache.remember)
+
+多个线程持续读取同一个短 TTL 的键，计算函数模拟一次较慢的查询与渲染。
+检查冷启动时只计算一次、跨过 TTL 边界时 p99 延迟不出现尖峰；
+另检查流式分析写入梦境记录时不会失效公开列表缓存、计算期间发生的失效不会被旧结果覆盖。运行: python -m pytest benchmarks -q -s
+"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dreamecho.cache import Cache, LocalCache, SQLiteBackend  # noqa: E402
+
+COMPUTE_SECONDS = 0.05
+THREADS = 16
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = Cache()
+    cache.backend = SQLiteBackend(str(tmp_path / 'cache.db'))
+    cache.local = LocalCache(0.05, 1024)
+    cache.stale_timeout = 5
+    return cache
+
+
+@pytest.fixture
+def app_context():
+    from flask import Flask
+
+    with Flask(__name__).app_context():
+        yield
+
+
+class SlowCompute:
+    """计数的慢计算函数"""
+
+    def __init__(self):
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+        time.sleep(COMPUTE_SECONDS)
+        return {'page': 'x' * 1024}
+
+
+def run_threads(target, count=THREADS):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_cold_key_is_computed_once(cache, app_context):
+    compute = SlowCompute()
+    run_threads(lambda: cache.remember('page:index', compute, timeout=60))
+    assert compute.calls == 1
+
+
+def test_p99_latency_across_ttl_boundaries(cache, app_context):
+    from flask import current_app
+
+    app = current_app._get_current_object()
+    compute = SlowCompute()
+    latencies = []
+    stop = time.monotonic() + 2.0
+
+    def reader():
+        with app.app_context():
+            while time.monotonic() < stop:
+                started = time.perf_counter()
+                cache.remember('page:index', compute, timeout=0.2)
+                latencies.append(time.perf_counter() - started)
+                time.sleep(0.001)
+
+    run_threads(reader)
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[int(len(latencies) * 0.99)]
+    print(f'\n{len(latencies)} 次读取，计算 {compute.calls} 次 (TTL 0.2s，共 2s)')
+    print(f'p50 {p50 * 1000:.2f} ms, p99 {p99 * 1000:.2f} ms, max {latencies[-1] * 1000:.2f} ms')
+
+    # 只有首次冷启动需要等待计算，之后的过期都由后台线程刷新；刷新之间互不重叠
+    assert p99 < COMPUTE_SECONDS
+    assert compute.calls <= 2.0 / COMPUTE_SECONDS
+
+
+def test_invalidation_during_compute_discards_result(cache, app_context):
+    def compute():
+        time.sleep(COMPUTE_SECONDS)
+        return 'stale'
+
+    invalidator = threading.Timer(COMPUTE_SECONDS / 2, cache.invalidate_tags, args=('dreams:public',))
+    invalidator.start()
+    assert cache.remember('page:model_library', compute, timeout=60, tags=('dreams:public',)) == 'stale'
+    invalidator.join()
+    # 计算开始后标签已失效，结果只返回给本次请求，不写入缓存
+    assert cache.get('page:model_library') is None
+
+    assert cache.remember('page:model_library', lambda: 'fresh', timeout=60, tags=('dreams:public',)) == 'fresh'
+    assert cache.get('page:model_library')[0] == 'fresh'
+
+
+def test_partial_analysis_flush_keeps_public_listing(tmp_path):
+    """流式分析期间反复写入分析字段不应失效公开列表缓存；梦境完成 (进入列表) 时才失效"""
+    from dreamecho import create_app
+    from dreamecho.dreams import save_partial_analysis
+    from dreamecho.extensions import cache, db
+    from dreamecho.models import PUBLIC_DREAMS_TAG, Dream, User
+
+    app = create_app({
+        'TESTING': True,
+        'APP_PROFILE': 'full',
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'flush.db'}",
+        'CACHE_SQLITE_PATH': str(tmp_path / 'flush-cache.db'),
+    })
+    with app.app_context():
+        db.create_all()
+        user = User(username='flush', email='flush@example.com', is_active=True)
+        db.session.add(user)
+        db.session.flush()
+        dream = Dream(user_id=user.id, title='流式分析', dream_text='月光下的古老城堡', status='processing', is_public=True)
+        db.session.add(dream)
+        db.session.commit()
+
+        compute = SlowCompute()
+        listing = lambda: cache.remember('page:model_library', compute, timeout=60, tags=(PUBLIC_DREAMS_TAG,))
+        listing()
+        for length in range(1, 11):
+            save_partial_analysis(dream, {'keywords': ['星空', '城堡'], 'interpretation': '梦境反映了' * length})
+            listing()
+        assert compute.calls == 1
+
+        dream.status = 'complete'
+        db.session.commit()
+        listing()
+        assert compute.calls == 2
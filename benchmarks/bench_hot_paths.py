@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+热点函数微基准
+
+覆盖每个梦境、每个请求都会执行的纯 Python 代码：LLM 输出中分析结果的提取与校验、模型提示词生成、
+梦境/用户序列化 (一页 100 个梦境) 与进度查询接口。每个用例取多轮中最快一轮的单次耗时，
+超过预算即失败，作为回归门槛。预算可用环境变量 HOT_PATH_BUDGET_SCALE 按机器整体放宽。
+运行: python -m pytest benchmarks -q -s
+"""
+
+import os
+import sys
+import timeit
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_services import analysis_content  # noqa: E402
+
+# 单次调用耗时预算 (微秒)
+BUDGET_SCALE = float(os.getenv('HOT_PATH_BUDGET_SCALE', 1))
+BUDGETS_US = {
+    'parse_analysis': 150,
+    'parse_analysis_unfenced': 150,
+    'parse_analysis_repaired': 400,
+    'generate_model_prompt': 5,
+    'dream_to_dict_page': 1500,
+    'user_snapshot': 50,
+    'public_dreams_payload': 20000,
+    'get_progress': 3000,
+}
+PAGE_SIZE = 100
+REPEAT = 5
+
+
+def per_call_us(func, *args):
+    """多轮计时中最快一轮的单次调用耗时 (微秒)"""
+    timer = timeit.Timer(lambda: func(*args))
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=REPEAT, number=number)) / number * 1e6
+
+
+def check_budget(name, func, *args):
+    elapsed = per_call_us(func, *args)
+    budget = BUDGETS_US[name] * BUDGET_SCALE
+    print(f'\n{name}: {elapsed:.2f} us (预算 {budget:.0f} us)')
+    assert elapsed <= budget, f'{name} 单次耗时 {elapsed:.2f} us 超过预算 {budget:.0f} us'
+
+
+@pytest.fixture(scope='module')
+def app(tmp_path_factory):
+    from dreamecho import create_app
+    from dreamecho.extensions import db
+    from dreamecho.models import Dream, User
+
+    workdir = tmp_path_factory.mktemp('hot_paths')
+    app = create_app({
+        'TESTING': True,
+        'APP_PROFILE': 'full',
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{workdir / 'bench.db'}",
+        'CACHE_SQLITE_PATH': str(workdir / 'cache.db'),
+        'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1',
+    })
+    with app.app_context():
+        db.create_all()
+        user = User(username='bench', email='bench@example.com', is_active=True)
+        db.session.add(user)
+        db.session.flush()
+        for number in range(PAGE_SIZE):
+            dream = Dream(
+                user_id=user.id, title=f'梦境 {number}', dream_text='月光下的古老城堡' * 20,
+                mood=('happy', 'calm', 'mysterious')[number % 3], style='surreal', blockchain='ethereum',
+                status='complete', is_public=True, created_at=datetime(2024, 4, 2, 12, 0, number % 60)
+            )
+            dream.set_tags('星空,海洋,城堡' if number % 2 else '飞行,月光')
+            db.session.add(dream)
+        db.session.commit()
+        yield app
+
+
+@pytest.fixture
+def app_context(app):
+    with app.app_context():
+        yield
+
+
+def test_parse_analysis():
+    from dreamecho.analysis_parser import parse_analysis
+
+    text = analysis_content(32 * 1024)
+    assert parse_analysis(text)['keywords']
+    check_budget('parse_analysis', parse_analysis, text)
+
+
+def test_parse_analysis_unfenced():
+    from dreamecho.analysis_parser import parse_analysis
+
+    text = analysis_content(32 * 1024).split('```json', 1)[1].rsplit('```', 1)[0]
+    assert parse_analysis(text)['keywords']
+    check_budget('parse_analysis_unfenced', parse_analysis, text)
+
+
+def test_parse_analysis_repaired():
+    from dreamecho.analysis_parser import parse_analysis
+
+    # 尾随逗号 + 被截断的结尾，需要修复后解析
+    text = analysis_content(32 * 1024).rsplit('"\n}', 1)[0].replace('"月光"\n  ]', '"月光",\n  ]')
+    assert parse_analysis(text)['keywords'][-1] == '月光'
+    check_budget('parse_analysis_repaired', parse_analysis, text)
+
+
+def test_generate_model_prompt():
+    from dreamecho.analysis_parser import parse_analysis
+    from dreamecho.converter import DreamToModelConverter
+
+    analysis = parse_analysis(analysis_content(4096))
+    check_budget('generate_model_prompt', DreamToModelConverter.generate_model_prompt, analysis)
+
+
+def test_dream_to_dict_page(app_context):
+    from dreamecho.models import Dream
+
+    dreams = Dream.query.order_by(Dream.id).limit(PAGE_SIZE).all()
+    assert len(dreams) == PAGE_SIZE
+    check_budget('dream_to_dict_page', lambda: [dream.to_dict() for dream in dreams])
+
+
+def test_user_snapshot(app_context):
+    from dreamecho.models import User
+
+    user = User.query.filter_by(username='bench').one()
+    check_budget('user_snapshot', user.snapshot)
+
+
+def test_public_dreams_payload(app_context):
+    from dreamecho.dreams import public_dreams_payload
+
+    assert len(public_dreams_payload(1, PAGE_SIZE, {}, [])['dreams']) == PAGE_SIZE
+    check_budget('public_dreams_payload', public_dreams_payload, 1, PAGE_SIZE, {}, [])
+
+
+def test_get_progress(app):
+    from dreamecho.progress import update_dream_progress
+
+    update_dream_progress(1, '生成模型', 40, 10, '正在生成3D模型...')
+    client = app.test_client()
+    assert client.get('/api/progress/1').get_json()['progress'] == 40
+    check_budget('get_progress', client.get, '/api/progress/1')
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+冷启动导入耗时基准 (python -X importtime)
+
+在新的解释器中按各配置档 (APP_PROFILE) 导入 WSGI 入口 app.py (即 worker 启动时的工作)，
+检查可选依赖没有被提前加载，并输出最慢的导入模块。运行: python -m pytest benchmarks -q -s
+"""
+
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 只在首次使用时才应加载的模块 (邮件、Bootstrap、梦境转换器依赖、迁移工具)
+DEFERRED_MODULES = ('flask_mail', 'flask_bootstrap', 'requests', 'tenacity', 'tqdm', 'flask_migrate', 'alembic')
+# 不使用数据库的配置档不应加载 ORM
+DATABASE_MODULES = ('sqlalchemy', 'flask_sqlalchemy', 'flask_login')
+PROFILES = ('full', 'fast', 'static')
+# 导入 app 的耗时上限(毫秒)，可用环境变量按机器调整
+IMPORT_BUDGET_MS = float(os.getenv('IMPORT_BUDGET_MS', 1500))
+RUNS = 5
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$')
+
+
+def import_profile(statement, profile='full'):
+    """在子进程中执行导入语句，返回 {模块: 累计耗时(微秒)}"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        cwd=PROJECT_ROOT, env=dict(os.environ, APP_PROFILE=profile),
+        capture_output=True, text=True, check=True
+    )
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            cumulative[match.group(4)] = int(match.group(2))
+    return cumulative
+
+
+def best_of(statement, module, profile='full', runs=RUNS):
+    """多次运行取最小值，降低磁盘缓存与调度抖动的影响"""
+    return min(import_profile(statement, profile)[module] for _ in range(runs))
+
+
+@pytest.mark.parametrize('profile', PROFILES)
+def test_app_import_skips_optional_dependencies(profile):
+    deferred = DEFERRED_MODULES + (DATABASE_MODULES if profile != 'full' else ())
+    modules = import_profile('import app', profile)
+    loaded = [name for name in modules if name.split('.')[0] in deferred]
+    assert not loaded, f'{profile} 配置档导入 app 时提前加载了: {loaded}'
+
+
+@pytest.mark.parametrize('profile', PROFILES)
+def test_app_import_time(profile):
+    flask_us = best_of('import flask', 'flask', profile)
+    app_us = best_of('import app', 'app', profile)
+
+    modules = import_profile('import app', profile)
+    slowest = sorted(((us, name) for name, us in modules.items() if name.startswith('dreamecho')), reverse=True)
+    print(f'\n[{profile}] import flask: {flask_us / 1000:.1f} ms')
+    print(f'[{profile}] import app:   {app_us / 1000:.1f} ms (create_app 与全部依赖)')
+    for us, name in slowest[:8]:
+        print(f'  {name:<28} {us / 1000:7.1f} ms')
+
+    assert app_us / 1000 < IMPORT_BUDGET_MS
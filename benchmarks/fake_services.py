@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DeepSeek / Tripo 本地替身服务 (压测用)
+
+在一个 HTTP 服务中模拟：
+- DeepSeek  POST /v1/chat/completions               返回 Markdown 包裹的梦境分析 JSON (批量请求返回带 id 的数组)；
+                                                    请求中 "stream": true 时以 SSE 分段输出，延迟平均分布在各段之间
+- Tripo     POST /v2/openapi/task                   创建任务
+            GET  /v2/openapi/task/<task_id>         任务在 tripo_latency 秒后变为 success
+            GET  /models/<task_id>.glb              下载 payload_bytes 字节的模型文件
+
+延迟、失败率与响应大小可配置。单独运行: python benchmarks/fake_services.py --port 9100
+应用配置 DEEPSEEK_API_BASE=http://127.0.0.1:9100/v1 与 TRIPO_API_BASE=http://127.0.0.1:9100/v2/openapi
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STREAM_CHUNK_CHARS = 16
+TASK_PATH = re.compile(r'^/v2/openapi/task/([0-9a-f]+)$')
+MODEL_PATH = re.compile(r'^/models/([0-9a-f]+)\.glb$')
+BATCH_ID = re.compile(r'^\s*\[id=(\d+)\]', re.M)
+
+
+class FakeServiceSettings:
+    """替身服务参数 (秒 / 比例 / 字节)"""
+
+    def __init__(self, deepseek_latency=0.5, tripo_latency=2.0, failure_rate=0.0, payload_bytes=64 * 1024):
+        self.deepseek_latency = deepseek_latency
+        self.tripo_latency = tripo_latency
+        self.failure_rate = failure_rate
+        self.payload_bytes = payload_bytes
+
+
+def sample_analysis(payload_bytes):
+    return {
+        'keywords': ['星空', '海洋', '飞行', '古老城堡', '月光'],
+        'symbols': ['月亮', '钥匙', '旋转楼梯'],
+        'emotions': ['宁静', '好奇', '怀旧'],
+        'visual_description': '月光下漂浮在海面上的古老城堡，旋转楼梯通向星空',
+        'interpretation': '梦境反映了对未知的好奇与对过去的怀念。' * max(1, payload_bytes // 2048)
+    }
+
+
+def analysis_content(payload_bytes):
+    """模拟 LLM 输出：Markdown 代码块中的 JSON，解析文本按 payload_bytes 填充"""
+    analysis = sample_analysis(payload_bytes)
+    return '以下是分析结果：\n```json\n' + json.dumps(analysis, ensure_ascii=False, indent=2) + '\n```'
+
+
+def batch_analysis_content(ids, payload_bytes):
+    """模拟批量分析的输出：带 id 的 JSON 数组"""
+    analyses = [{'id': int(dream_id), **sample_analysis(payload_bytes)} for dream_id in ids]
+    return '```json\n' + json.dumps(analyses, ensure_ascii=False, indent=2) + '\n```'
+
+
+class FakeServiceHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    settings = FakeServiceSettings()
+    tasks = {}  # task_id -> 创建时间
+    tasks_lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_stream(self, content):
+        """按 OpenAI 兼容格式分段输出 (data: {...} ... data: [DONE])，结束后关闭连接"""
+        pieces = [content[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(content), STREAM_CHUNK_CHARS)]
+        delay = self.settings.deepseek_latency / len(pieces)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+        for piece in pieces:
+            time.sleep(delay)
+            event = {'choices': [{'index': 0, 'delta': {'content': piece}}]}
+            self.wfile.write(f'data: {json.dumps(event, ensure_ascii=False)}\n\n'.encode('utf-8'))
+            self.wfile.flush()
+        self.wfile.write(b'data: [DONE]\n\n')
+
+    def _failed(self):
+        return random.random() < self.settings.failure_rate
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length)
+
+        if self.path == '/v1/chat/completions':
+            if self._failed():
+                time.sleep(self.settings.deepseek_latency)
+                return self._send_json(503, {'error': {'message': 'simulated failure'}})
+            payload = json.loads(body or b'{}')
+            ids = BATCH_ID.findall(payload.get('messages', [{}])[-1].get('content', ''))
+            if ids:
+                content = batch_analysis_content(ids, self.settings.payload_bytes)
+            else:
+                content = analysis_content(self.settings.payload_bytes)
+            if payload.get('stream'):
+                return self._send_stream(content)
+            time.sleep(self.settings.deepseek_latency)
+            return self._send_json(200, {
+                'choices': [{'message': {'role': 'assistant', 'content': content}}]
+            })
+
+        if self.path == '/v2/openapi/task':
+            if self._failed():
+                return self._send_json(503, {'code': 503, 'message': 'simulated failure'})
+            task_id = uuid.uuid4().hex
+            with self.tasks_lock:
+                self.tasks[task_id] = time.monotonic()
+            return self._send_json(200, {'code': 0, 'data': {'task_id': task_id}})
+
+        self._send_json(404, {'error': 'not found'})
+
+    def do_GET(self):
+        match = TASK_PATH.match(self.path)
+        if match:
+            with self.tasks_lock:
+                created = self.tasks.get(match.group(1))
+            if created is None:
+                return self._send_json(404, {'code': 404, 'data': {'status': 'unknown'}})
+            if time.monotonic() - created < self.settings.tripo_latency:
+                return self._send_json(200, {'code': 0, 'data': {'status': 'running'}})
+            host = self.headers.get('Host')
+            return self._send_json(200, {'code': 0, 'data': {
+                'status': 'success', 'output': {'model': f'http://{host}/models/{match.group(1)}.glb'}
+            }})
+
+        if MODEL_PATH.match(self.path):
+            body = b'glTF' + bytes(max(0, self.settings.payload_bytes - 4))
+            self.send_response(200)
+            self.send_header('Content-Type', 'model/gltf-binary')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        self._send_json(404, {'error': 'not found'})
+
+
+def start_fake_services(settings, host='127.0.0.1', port=0):
+    """在后台线程中启动替身服务，返回 (server, base_url)"""
+    handler = type('ConfiguredFakeServiceHandler', (FakeServiceHandler,), {'settings': settings, 'tasks': {}})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://{host}:{server.server_address[1]}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='DeepSeek / Tripo 本地替身服务')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9100)
+    parser.add_argument('--deepseek-latency', type=float, default=0.5, help='DeepSeek 响应延迟(秒)')
+    parser.add_argument('--tripo-latency', type=float, default=2.0, help='Tripo 任务完成耗时(秒)')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='请求失败比例')
+    parser.add_argument('--payload-bytes', type=int, default=64 * 1024, help='模型文件与分析文本的大小')
+    args = parser.parse_args()
+
+    settings = FakeServiceSettings(args.deepseek_latency, args.tripo_latency, args.failure_rate, args.payload_bytes)
+    server, base_url = start_fake_services(settings, args.host, args.port)
+    print(f'替身服务已启动: DEEPSEEK_API_BASE={base_url}/v1 TRIPO_API_BASE={base_url}/v2/openapi')
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+端到端压测
+
+启动本地 DeepSeek/Tripo 替身服务 (fake_services.py) 与应用 (flask run，临时数据库与缓存)，
+按场景并发请求，输出吞吐量、p50/p95/p99 延迟与错误率 (JSON)，并可与基线比较。
+
+场景:
+  anonymous  匿名浏览首页、关于页与模型库
+  library    模型库翻页与筛选、/api/dreams 分页
+  dream      登录后提交梦境并轮询进度直到完成 (pipeline 为提交到完成的端到端耗时)
+  login      登录风暴 (每次使用新会话)
+
+示例:
+  python benchmarks/loadtest.py --duration 20 --concurrency 8 --output after.json --baseline before.json
+  python benchmarks/loadtest.py --scenarios anonymous,library --save-baseline benchmarks/baseline.json
+  python benchmarks/loadtest.py --base-url http://127.0.0.1:5001 --scenarios anonymous   # 压测已运行的实例
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+
+import requests
+
+from fake_services import FakeServiceSettings, start_fake_services
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ADMIN_CREDENTIALS = {'username': '123', 'password': '123'}  # flask init-db 创建的测试账号
+MOODS = ('happy', 'calm', 'mysterious', 'scary')
+STYLES = ('realistic', 'cartoon', 'surreal')
+BLOCKCHAINS = ('ethereum', 'polygon')
+SCENARIOS = ('anonymous', 'library', 'dream', 'login')
+# 与基线比较时的检查项: (指标, 变差方向)
+COMPARED_METRICS = (('throughput_rps', -1), ('p50_ms', 1), ('p95_ms', 1), ('p99_ms', 1))
+
+
+class Recorder:
+    """线程安全地记录每个请求的 (场景, 名称, 耗时, 状态码, 是否成功)"""
+
+    def __init__(self):
+        self.samples = []
+        self._lock = threading.Lock()
+
+    def add(self, scenario, name, seconds, status, ok):
+        with self._lock:
+            self.samples.append((scenario, name, seconds, status, ok))
+
+    def request(self, scenario, name, session, method, url, expected=(200,), **kwargs):
+        started = time.perf_counter()
+        try:
+            response = session.request(method, url, timeout=60, allow_redirects=False, **kwargs)
+        except requests.RequestException:
+            self.add(scenario, name, time.perf_counter() - started, 'error', False)
+            return None
+        self.add(scenario, name, time.perf_counter() - started, response.status_code, response.status_code in expected)
+        return response
+
+
+def login(recorder, scenario, session, base_url):
+    response = recorder.request(scenario, 'POST /login', session, 'POST', f'{base_url}/login',
+                                expected=(302,), data=ADMIN_CREDENTIALS)
+    return response is not None and response.status_code == 302
+
+
+def anonymous_scenario(recorder, base_url, session, stop):
+    for path in ('/', '/about', '/model_library'):
+        recorder.request('anonymous', f'GET {path}', session, 'GET', base_url + path)
+
+
+def library_scenario(recorder, base_url, session, stop):
+    page = random.randint(1, 5)
+    params = {'page': page}
+    if random.random() < 0.5:
+        params['mood'] = random.choice(MOODS)
+    recorder.request('library', 'GET /model_library', session, 'GET', f'{base_url}/model_library', params=params)
+    recorder.request('library', 'GET /api/dreams', session, 'GET', f'{base_url}/api/dreams',
+                     params={'page': page, 'style': random.choice(STYLES)})
+
+
+def dream_scenario(recorder, base_url, session, stop):
+    if not session.cookies:
+        login(recorder, 'dream', session, base_url)
+    started = time.perf_counter()
+    response = recorder.request('dream', 'POST /api/dreams/create', session, 'POST', f'{base_url}/api/dreams/create', data={
+        'title': '压测梦境', 'description': '我梦见自己在月光下的海面上飞行，远处有一座古老的城堡。', 'tags': '飞行,城堡'
+    })
+    if response is None or response.status_code != 200:
+        return
+    dream_id = response.json()['dream_id']
+    while not stop.is_set():
+        time.sleep(0.5)
+        response = recorder.request('dream', 'GET /api/progress', session, 'GET', f'{base_url}/api/progress/{dream_id}',
+                                    expected=(200, 500))
+        if response is None:
+            return
+        progress = response.json()
+        if progress.get('progress', 0) >= 100 or progress.get('stage') == '失败' or response.status_code == 500:
+            ok = response.status_code == 200 and progress.get('progress', 0) >= 100
+            recorder.add('dream', 'pipeline', time.perf_counter() - started, response.status_code, ok)
+            return
+
+
+def login_scenario(recorder, base_url, session, stop):
+    login(recorder, 'login', requests.Session(), base_url)
+
+
+SCENARIO_FUNCTIONS = {
+    'anonymous': anonymous_scenario,
+    'library': library_scenario,
+    'dream': dream_scenario,
+    'login': login_scenario,
+}
+
+
+def run_scenario(name, base_url, duration, concurrency, recorder):
+    """concurrency 个虚拟用户循环执行场景 duration 秒"""
+    stop = threading.Event()
+
+    def user():
+        session = requests.Session()
+        while not stop.is_set():
+            SCENARIO_FUNCTIONS[name](recorder, base_url, session, stop)
+
+    threads = [threading.Thread(target=user, daemon=True) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join(timeout=60)
+    return time.perf_counter() - started
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(samples, elapsed):
+    """汇总一组样本：吞吐量、延迟分位数 (毫秒)、错误率与状态码分布"""
+    latencies = sorted(seconds for _, _, seconds, _, _ in samples)
+    errors = sum(1 for *_, ok in samples if not ok)
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'error_rate': round(errors / len(samples), 4) if samples else 0.0,
+        'throughput_rps': round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        'max_ms': round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        'status_counts': dict(Counter(str(status) for _, _, _, status, _ in samples)),
+    }
+
+
+def build_report(recorder, elapsed_by_scenario, args):
+    by_scenario = defaultdict(list)
+    by_request = defaultdict(list)
+    for sample in recorder.samples:
+        by_scenario[sample[0]].append(sample)
+        by_request[(sample[0], sample[1])].append(sample)
+
+    scenarios = {}
+    for name, elapsed in elapsed_by_scenario.items():
+        # pipeline 是端到端耗时，不计入请求吞吐量
+        requests_only = [sample for sample in by_scenario[name] if sample[1] != 'pipeline']
+        scenarios[name] = dict(summarize(requests_only, elapsed), endpoints={
+            request_name: summarize(samples, elapsed)
+            for (scenario, request_name), samples in sorted(by_request.items()) if scenario == name
+        })
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'cpu_count': os.cpu_count(),
+            'duration': args.duration,
+            'concurrency': args.concurrency,
+            'fake_services': {
+                'deepseek_latency': args.deepseek_latency, 'tripo_latency': args.tripo_latency,
+                'failure_rate': args.failure_rate, 'payload_bytes': args.payload_bytes
+            },
+        },
+        'scenarios': scenarios,
+    }
+
+
+def compare(report, baseline, max_regression):
+    """与基线比较，返回回归项列表；吞吐量下降或延迟上升超过 max_regression 比例、错误率上升超过1个百分点视为回归"""
+    regressions = []
+    for name, current in report['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if not previous:
+            continue
+        for metric, direction in COMPARED_METRICS:
+            before, after = previous.get(metric), current.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            print(f'  {name:<10} {metric:<15} {before:>10} -> {after:>10} ({change:+.1%})')
+            if change * direction > max_regression:
+                regressions.append(f'{name}.{metric}: {before} -> {after} ({change:+.1%})')
+        if current['error_rate'] - previous.get('error_rate', 0) > 0.01:
+            regressions.append(f"{name}.error_rate: {previous.get('error_rate', 0)} -> {current['error_rate']}")
+    return regressions
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def seed_dreams(path, count):
+    """生成已完成的公开梦境 (NDJSON)，通过 flask dreams import 导入"""
+    with open(path, 'w', encoding='utf-8') as out:
+        for dream_id in range(1, count + 1):
+            out.write(json.dumps({
+                'id': dream_id, 'user_id': 1, 'title': f'梦境 {dream_id}', 'dream_text': '月光下的古老城堡' * 10,
+                'description': '我梦见自己在海面上飞行' * 5, 'status': 'complete', 'is_public': True,
+                'mood': MOODS[dream_id % len(MOODS)], 'style': STYLES[dream_id % len(STYLES)],
+                'blockchain': BLOCKCHAINS[dream_id % len(BLOCKCHAINS)], 'price': 0.1,
+                'tags': '星空,海洋' if dream_id % 2 else '城堡,飞行', 'created_at': '2024-04-02T12:00:00'
+            }, ensure_ascii=False) + '\n')
+
+
+class AppServer:
+    """在临时目录中初始化数据库并启动应用 (flask run)"""
+
+    def __init__(self, fake_base_url, dreams, server_command=None):
+        self.workdir = tempfile.mkdtemp(prefix='dreamecho-loadtest-')
+        self.port = free_port()
+        self.base_url = f'http://127.0.0.1:{self.port}'
+        self.env = dict(
+            os.environ,
+            PYTHONPATH=PROJECT_ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''),
+            FLASK_APP='app',
+            APP_PROFILE='full',
+            DATABASE_URL=f"sqlite:///{os.path.join(self.workdir, 'loadtest.db')}",
+            CACHE_SQLITE_PATH=os.path.join(self.workdir, 'cache.db'),
+            DEEPSEEK_API_BASE=f'{fake_base_url}/v1',
+            TRIPO_API_BASE=f'{fake_base_url}/v2/openapi',
+            TRIPO_POLL_INTERVAL='0.2',
+        )
+        self.dreams = dreams
+        self.server_command = server_command or [
+            sys.executable, '-m', 'flask', 'run', '--port', str(self.port), '--with-threads', '--no-reload'
+        ]
+        self.process = None
+
+    def flask(self, *args):
+        subprocess.run([sys.executable, '-m', 'flask', *args], cwd=self.workdir, env=self.env,
+                       check=True, stdout=subprocess.DEVNULL)
+
+    def start(self):
+        self.flask('init-db')
+        if self.dreams:
+            path = os.path.join(self.workdir, 'dreams.ndjson')
+            seed_dreams(path, self.dreams)
+            self.flask('dreams', 'import', '--table', 'dreams', '--input', path)
+        # 模型文件下载到工作目录下的 static/models
+        self.process = subprocess.Popen(
+            [part.format(port=self.port) for part in self.server_command],
+            cwd=self.workdir, env=self.env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            try:
+                if requests.get(f'{self.base_url}/health', timeout=1).status_code == 200:
+                    return
+            except requests.RequestException:
+                time.sleep(0.2)
+        self.stop()
+        raise RuntimeError('应用启动超时')
+
+    def stop(self):
+        if self.process is not None:
+            self.process.terminate()
+            self.process.wait(timeout=10)
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='DreamEcho 端到端压测')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help=f"逗号分隔，可选: {','.join(SCENARIOS)}")
+    parser.add_argument('--duration', type=float, default=15, help='每个场景的持续时间(秒)')
+    parser.add_argument('--concurrency', type=int, default=8, help='每个场景的虚拟用户数')
+    parser.add_argument('--dreams', type=int, default=500, help='预置的公开梦境数量')
+    parser.add_argument('--base-url', help='压测已运行的实例 (不启动应用与替身服务)')
+    parser.add_argument('--server-command', help='自定义启动命令，{port} 会被替换，例如 "gunicorn -w 4 -b 127.0.0.1:{port} app:app"')
+    parser.add_argument('--deepseek-latency', type=float, default=0.5)
+    parser.add_argument('--tripo-latency', type=float, default=2.0)
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    parser.add_argument('--payload-bytes', type=int, default=64 * 1024)
+    parser.add_argument('--output', help='结果 JSON 文件 (默认输出到标准输出)')
+    parser.add_argument('--baseline', help='与该基线 JSON 比较，出现回归时以状态码 1 退出')
+    parser.add_argument('--save-baseline', help='将结果另存为基线')
+    parser.add_argument('--max-regression', type=float, default=0.2, help='允许的变差比例')
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"未知场景: {','.join(sorted(unknown))}")
+
+    fake_server = app_server = None
+    base_url = args.base_url
+    if not base_url:
+        settings = FakeServiceSettings(args.deepseek_latency, args.tripo_latency, args.failure_rate, args.payload_bytes)
+        fake_server, fake_base_url = start_fake_services(settings)
+        server_command = args.server_command.split() if args.server_command else None
+        app_server = AppServer(fake_base_url, args.dreams, server_command)
+        app_server.start()
+        base_url = app_server.base_url
+
+    recorder = Recorder()
+    elapsed = {}
+    try:
+        for name in names:
+            print(f'运行场景 {name} ({args.concurrency} 并发, {args.duration:g} 秒)...', file=sys.stderr)
+            elapsed[name] = run_scenario(name, base_url, args.duration, args.concurrency, recorder)
+    finally:
+        if app_server:
+            app_server.stop()
+        if fake_server:
+            fake_server.shutdown()
+
+    report = build_report(recorder, elapsed, args)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as out:
+            out.write(text + '\n')
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as out:
+            out.write(text + '\n')
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as infile:
+            baseline = json.load(infile)
+        print(f'与基线 {args.baseline} 比较:', file=sys.stderr)
+        regressions = compare(report, baseline, args.max_regression)
+        if regressions:
+            print('性能回归:\n  ' + '\n  '.join(regressions), file=sys.stderr)
+            sys.exit(1)
+        print('未发现性能回归', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DreamEcho 应用工厂
+
+create_app(config) 创建应用实例：导入本包不会连接数据库，也不会加载邮件、
+Bootstrap、梦境转换器 (requests/tenacity/tqdm) 等可选依赖，它们在首次使用时才加载。
+建表与初始数据通过 `flask init-db` / `flask db upgrade` 完成。
+
+APP_PROFILE 选择部署配置档 (full / fast / static)，决定加载的蓝图、数据库与中间件，
+见 dreamecho/profiles.py。
+"""
+
+import importlib
+import os
+
+import click
+from flask import Flask
+
+from . import middleware, request_metrics
+from .profiler import profiler
+from .profiles import get_profile
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def create_app(config=None):
+    """
+    创建并配置应用
+
+    :param config: 覆盖默认配置，可以是 dict、配置类或其导入路径 (默认只使用 config.Config)
+    """
+    app = Flask(
+        __name__,
+        template_folder=os.path.join(PROJECT_ROOT, 'templates'),
+        static_folder=os.path.join(PROJECT_ROOT, 'static'),
+        instance_path=os.path.join(PROJECT_ROOT, 'instance')
+    )
+    app.config.from_object('config.Config')
+    load_config(app, config)
+    profile = get_profile(app.config['APP_PROFILE'])
+    app.config.update(profile['config'])
+    load_config(app, config)  # 显式传入的配置优先于配置档默认值
+
+    middleware.init_app(app)
+    request_metrics.init_app(app)
+    profiler.init_app(app)
+    if profile['database']:
+        init_extensions(app)
+    if app.config['BOOTSTRAP_ENABLED']:
+        from .extensions import bootstrap
+        bootstrap.get(app)
+    register_blueprints(app, profile['blueprints'])
+    configure_logging(app)
+    return app
+
+
+def load_config(app, config):
+    """应用 dict、配置类或导入路径形式的配置"""
+    if isinstance(config, dict):
+        app.config.from_mapping(config)
+    elif config is not None:
+        app.config.from_object(config)
+
+
+def init_extensions(app):
+    """初始化数据库相关扩展与命令 (仅 full 配置档)"""
+    from . import cli
+    from .cache import FragmentCacheExtension
+    from .database import init_database
+    from .extensions import cache, db, login_manager, password_hasher, query_inspector
+    from .tags import init_tag_suggester
+
+    init_database(app, db)
+    if app.config['METRICS_ENABLED']:
+        with app.app_context():
+            request_metrics.instrument_engines(db)
+    query_inspector.init_app(app, db)
+    cache.init_app(app)
+    app.jinja_env.add_extension(FragmentCacheExtension)
+    password_hasher.init_app(app)
+    if migrations_enabled(app):
+        # Flask-Migrate 会导入 alembic，WSGI 进程不需要
+        from flask_migrate import Migrate
+        Migrate(app, db)
+    login_manager.init_app(app)
+    login_manager.login_view = 'auth.login'  # 指定登录页面的端点
+    login_manager.login_message = u"请先登录以访问此页面。"
+    login_manager.login_message_category = "info"  # 消息类别，用于样式化 (例如 alert-info)
+
+    init_tag_suggester(app)
+    cli.init_app(app)
+
+
+def migrations_enabled(app):
+    """是否注册 flask db 迁移命令：未配置时按是否由 flask 命令行创建应用判断"""
+    enabled = app.config['MIGRATE_ENABLED']
+    if enabled is None:
+        return click.get_current_context(silent=True) is not None
+    return enabled
+
+
+def register_blueprints(app, names):
+    """注册配置档中的蓝图 (未启用的蓝图模块不会被导入)"""
+    for name in names:
+        app.register_blueprint(importlib.import_module(f'{__name__}.{name}').bp)
+
+
+def configure_logging(app):
+    """应用日志经队列异步写入 logs/ 下按大小滚动的 JSON 行文件"""
+    from .logging_pipeline import configure_logging as configure_log_pipeline
+
+    configure_log_pipeline(app, os.path.join(PROJECT_ROOT, 'logs'))
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+管理页 (仅管理员)
+"""
+
+from functools import wraps
+
+from flask import Blueprint, abort, current_app, render_template, request, send_from_directory
+from flask_login import current_user, login_required
+
+from .stage_timing import PERCENTILES, PIPELINE_STAGES, stage_percentiles
+
+bp = Blueprint('admin', __name__, url_prefix='/admin')
+
+def admin_required(view):
+    """登录且为管理员，否则返回 403"""
+    @wraps(view)
+    @login_required
+    def wrapper(*args, **kwargs):
+        if not current_user.is_admin:
+            abort(403)
+        return view(*args, **kwargs)
+    return wrapper
+
+@bp.route('/pipeline')
+@admin_required
+def pipeline_timings():
+    """梦境生成各阶段耗时分位数 (按天)"""
+    days = min(max(request.args.get('days', 7, type=int), 1), 90)
+    return render_template(
+        'admin/pipeline.html', rows=stage_percentiles(days), days=days,
+        stages=PIPELINE_STAGES, percentiles=PERCENTILES
+    )
+
+@bp.route('/queries')
+@admin_required
+def query_report():
+    """本进程最近的 N+1 嫌疑与慢查询 (按端点汇总)"""
+    inspector = current_app.extensions['query_inspector']
+    return render_template(
+        'admin/queries.html', summary=inspector.summary(), reports=inspector.recent_reports(),
+        sample_rate=inspector.sample_rate, threshold=inspector.n_plus_one_threshold,
+        slow_query_ms=inspector.slow_query_seconds * 1000
+    )
+
+@bp.route('/profiles')
+@admin_required
+def profiles():
+    """抽样分析结果文件列表"""
+    profiler = current_app.extensions.get('profiler')
+    return render_template('admin/profiles.html', profiler=profiler, files=profiler.list_files() if profiler else [])
+
+@bp.route('/profiles/<path:name>')
+@admin_required
+def download_profile(name):
+    """下载分析结果文件"""
+    profiler = current_app.extensions.get('profiler')
+    if profiler is None:
+        abort(404)
+    return send_from_directory(profiler.directory, name, as_attachment=True)
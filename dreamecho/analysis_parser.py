@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LLM 梦境分析结果解析
+
+DeepSeek 偶尔在 JSON 前后附带说明文字、Markdown 代码块，或输出尾随逗号、注释、中文引号、
+Python 字面量、未加引号的键、被截断的结尾等格式问题。这里一次扫描找出文本中第一个括号配平的
+顶层对象 (字符串整体由正则跳过，括号不受字符串内容影响)，无法直接解析时修复常见问题后再试，
+最后校验五个必需字段并规范化为字符串列表/字符串。
+
+StreamingAnalysis 用于流式输出：每收到一段文本只扫描新增部分，顶层字段的值一结束即可取用，
+正在输出的字符串字段 (例如 interpretation) 也可以取得已收到的前缀。
+"""
+
+import json
+import re
+
+LIST_FIELDS = ('keywords', 'symbols', 'emotions')
+TEXT_FIELDS = ('visual_description', 'interpretation')
+REQUIRED_FIELDS = LIST_FIELDS + TEXT_FIELDS
+
+_STRING = r'"[^"\\]*(?:\\.[^"\\]*)*"'
+# 扫描：完整的字符串、括号，或未闭合字符串的起始引号 (输出被截断)
+STRUCTURE_TOKEN = re.compile(_STRING + r'|[{}\[\]]|"', re.S)
+# 修复：字符串原样保留，只处理字符串之外的部分
+REPAIR_TOKEN = re.compile(
+    _STRING
+    + r"|'([^'\\]*(?:\\.[^'\\]*)*)'"  # 单引号字符串
+    + r'|//[^\n]*|/\*.*?\*/'  # 注释
+    + r'|(?<=[{,])(\s*)([A-Za-z_][A-Za-z0-9_]*)(?=\s*:)'  # 未加引号的键
+    + r'|,(?=\s*[}\]])'  # 尾随逗号
+    + r'|(?<=["\]}])(?=\s*\n\s*["{\[])'  # 换行分隔但缺少逗号的元素
+    + r'|\b(?:True|False|None)\b'
+    + r'|[“”]',
+    re.S
+)
+# 流式扫描另外需要顶层的冒号与逗号来划分键值
+STREAM_TOKEN = re.compile(_STRING + r'|[{}\[\]:,]|"', re.S)
+PYTHON_LITERALS = {'True': 'true', 'False': 'false', 'None': 'null'}
+CLOSERS = {'{': '}', '[': ']'}
+LIST_SEPARATORS = re.compile(r'[,，、;；\n]+')
+
+
+class AnalysisFormatError(ValueError):
+    """LLM 输出中没有可用的分析结果"""
+
+
+def json_candidates(text, opener='{'):
+    """
+    依次给出文本中的顶层 JSON 对象 (opener 为 '[' 时为数组)
+
+    :return: 生成对象文本；文本在对象中途结束 (输出被截断) 时补齐引号与括号
+    """
+    position = 0
+    while True:
+        begin = text.find(opener, position)
+        if begin < 0:
+            return
+        stack = []
+        for match in STRUCTURE_TOKEN.finditer(text, begin):
+            token = match.group(0)
+            if token in CLOSERS:
+                stack.append(token)
+            elif token in '}]':
+                if not stack or CLOSERS[stack.pop()] != token:
+                    break  # 括号不匹配，从下一个 { 重新开始
+                if not stack:
+                    yield text[begin:match.end()]
+                    break
+            elif token == '"':
+                yield text[begin:].rstrip() + '"' + ''.join(CLOSERS[opener] for opener in reversed(stack))
+                return
+        else:
+            yield text[begin:].rstrip() + ''.join(CLOSERS[opener] for opener in reversed(stack))
+            return
+        position = match.end() if not stack else begin + 1
+
+
+def _repair_token(match):
+    token = match.group(0)
+    if not token:
+        return ','
+    if token.startswith('"'):
+        return token
+    if token.startswith("'"):
+        return '"' + match.group(1).replace("\\'", "'").replace('"', '\\"') + '"'
+    if token.startswith('/'):
+        return ''
+    if match.group(3):
+        return f'{match.group(2)}"{match.group(3)}"'
+    if token == ',':
+        return ''
+    if token in PYTHON_LITERALS:
+        return PYTHON_LITERALS[token]
+    return '"'
+
+
+def repair_json(candidate):
+    """修复 LLM 常见的 JSON 格式问题 (不改动字符串内容)"""
+    return REPAIR_TOKEN.sub(_repair_token, candidate)
+
+
+def _string_items(field, value):
+    if isinstance(value, str):
+        value = LIST_SEPARATORS.split(value)
+    elif not isinstance(value, list):
+        raise AnalysisFormatError(f'字段 {field} 应为字符串列表')
+    items = []
+    for item in value:
+        if isinstance(item, dict):
+            # 例如 [{"symbol": "月亮", "meaning": "..."}]，取第一个字符串值
+            item = next((part for part in item.values() if isinstance(part, str)), '')
+        elif not isinstance(item, (str, int, float)):
+            continue
+        item = str(item).strip()
+        if item:
+            items.append(item)
+    if not items:
+        raise AnalysisFormatError(f'字段 {field} 为空')
+    return items
+
+
+def normalize_field(field, value):
+    """校验并规范化一个必需字段：列表字段为字符串列表，文本字段为去掉首尾空白的字符串"""
+    if field in LIST_FIELDS:
+        return _string_items(field, value)
+    if not isinstance(value, str):
+        raise AnalysisFormatError(f'字段 {field} 应为字符串')
+    value = value.strip()
+    if field == 'visual_description' and not value:
+        raise AnalysisFormatError('字段 visual_description 为空')
+    return value
+
+
+def validate_analysis(data):
+    """校验必需字段，返回只包含必需字段的规范化结果"""
+    if not isinstance(data, dict):
+        raise AnalysisFormatError('返回结果不是 JSON 对象')
+    missing = [field for field in REQUIRED_FIELDS if field not in data]
+    if missing:
+        raise AnalysisFormatError(f"返回结果缺少字段: {', '.join(missing)}")
+    return {field: normalize_field(field, data[field]) for field in REQUIRED_FIELDS}
+
+
+def parse_analysis(text):
+    """
+    从 LLM 输出中取出梦境分析结果
+
+    :return: {'keywords': [...], 'symbols': [...], 'emotions': [...], 'visual_description': str, 'interpretation': str}
+    :raises AnalysisFormatError: 没有找到符合要求的对象
+    """
+    error = AnalysisFormatError('返回内容中没有 JSON 对象')
+    for candidate in json_candidates(text or ''):
+        try:
+            data = json.loads(candidate, strict=False)
+        except ValueError:
+            try:
+                data = json.loads(repair_json(candidate), strict=False)
+            except ValueError as e:
+                error = AnalysisFormatError(f'JSON 格式错误: {e}')
+                continue
+        try:
+            return validate_analysis(data)
+        except AnalysisFormatError as e:
+            error = e
+    raise error
+
+
+def parse_analyses(text):
+    """
+    从批量分析的输出 (元素带 id 的 JSON 数组) 中取出各梦境的分析结果
+
+    :return: {str(id): 分析结果}；不符合要求的元素跳过，由调用方单独处理
+    :raises AnalysisFormatError: 没有找到包含可用元素的数组
+    """
+    for candidate in json_candidates(text or '', '['):
+        try:
+            data = _load_value(candidate)
+        except ValueError:
+            # 整体无法解析 (例如输出被截断) 时逐个解析其中完整的对象
+            data = []
+            for element in json_candidates(candidate[1:]):
+                try:
+                    data.append(_load_value(element))
+                except ValueError:
+                    continue
+        if not isinstance(data, list):
+            continue
+        results = {}
+        for item in data:
+            if not isinstance(item, dict) or 'id' not in item:
+                continue
+            try:
+                results[str(item['id'])] = validate_analysis(item)
+            except AnalysisFormatError:
+                continue
+        if results:
+            return results
+    raise AnalysisFormatError('返回内容中没有分析结果数组')
+
+
+def _load_value(raw):
+    try:
+        return json.loads(raw, strict=False)
+    except ValueError:
+        return json.loads(repair_json(raw), strict=False)
+
+
+class StreamingAnalysis:
+    """
+    增量解析流式输出中的分析结果
+
+        parser = StreamingAnalysis()
+        for chunk in chunks:
+            parser.feed(chunk)
+            if parser.has(('visual_description', 'symbols', 'emotions')):
+                ...
+        analysis = parse_analysis(parser.text)
+
+    只跟踪第一个顶层对象中的必需字段；无法解析的值忽略，由最后的 parse_analysis 报告错误。
+    """
+
+    def __init__(self):
+        self.text = ''
+        self.fields = {}  # 已完整且通过校验的字段
+        self._position = 0  # 下次扫描的起点
+        self._depth = 0
+        self._key = None  # 当前顶层键
+        self._pending = None  # 顶层最近的字符串 (遇到冒号时成为键)
+        self._value_start = None
+        self._done = False
+
+    def feed(self, chunk):
+        """加入一段文本，返回本次新完成的字段名列表"""
+        self.text += chunk
+        if self._done:
+            return []
+        if not self._depth:
+            begin = self.text.find('{', self._position)
+            if begin < 0:
+                self._position = len(self.text)
+                return []
+            self._position = begin
+        completed = []
+        for match in STREAM_TOKEN.finditer(self.text, self._position):
+            token = match.group(0)
+            if token == '"':
+                # 字符串尚未结束，等待后续文本
+                self._position = match.start()
+                return completed
+            self._position = match.end()
+            if token in '{[':
+                self._depth += 1
+            elif token in '}]':
+                self._depth -= 1
+                if not self._depth:
+                    self._finish_value(match.start(), completed)
+                    self._done = True
+                    return completed
+            elif self._depth != 1:
+                continue
+            elif token == ':':
+                self._key, self._value_start = self._pending, match.end()
+            elif token == ',':
+                self._finish_value(match.start(), completed)
+            else:
+                self._pending = token
+        self._position = len(self.text)
+        return completed
+
+    def _finish_value(self, end, completed):
+        key, start = self._key, self._value_start
+        self._key = self._pending = self._value_start = None
+        if start is None:
+            return
+        try:
+            field = json.loads(key)
+            if field in REQUIRED_FIELDS and field not in self.fields:
+                self.fields[field] = normalize_field(field, _load_value(self.text[start:end]))
+                completed.append(field)
+        except (TypeError, ValueError):
+            pass
+
+    def has(self, fields):
+        return all(field in self.fields for field in fields)
+
+    def partial(self, field):
+        """字段已完整时返回其值；正在输出的字符串字段返回已收到的部分；否则返回 None"""
+        if field in self.fields:
+            return self.fields[field]
+        if self._done or self._depth != 1 or self._value_start is None or self._key is None:
+            return None
+        try:
+            if json.loads(self._key) != field:
+                return None
+        except ValueError:
+            return None
+        raw = self.text[self._value_start:].lstrip()
+        if not raw.startswith('"'):
+            return None
+        # 去掉末尾不完整的转义序列 (最长 \uXXX) 后补上引号
+        for cut in range(6):
+            try:
+                return json.loads(raw[:len(raw) - cut] + '"', strict=False)
+            except ValueError:
+                continue
+        return None
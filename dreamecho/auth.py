@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+登录、注册与退出
+"""
+
+from flask import Blueprint, flash, redirect, render_template, request, url_for
+from flask_login import login_required, login_user, logout_user
+
+from .extensions import db
+from .models import User
+from .passwords import PasswordHasherBusy
+
+bp = Blueprint('auth', __name__)
+
+@bp.route('/login', methods=['GET', 'POST'])
+def login():
+    """登录页面"""
+    if request.method == 'POST':
+        username = request.form.get('username')
+        password = request.form.get('password')
+        remember = request.form.get('remember', False)
+        
+        user = User.query.filter_by(username=username).first()
+        try:
+            authenticated = user is not None and user.check_password(password)
+        except PasswordHasherBusy as e:
+            flash(str(e), 'warning')
+            return render_template('login.html'), 503
+        if authenticated:
+            db.session.commit()  # 保存可能的重新哈希
+            login_user(user, remember=remember)
+            flash('登录成功', 'success')
+            next_page = request.args.get('next')
+            if next_page:
+                return redirect(next_page)
+            return redirect(url_for('main.index'))
+        flash('用户名或密码错误', 'danger')
+    
+    return render_template('login.html')
+
+@bp.route('/register', methods=['GET', 'POST'])
+def register():
+    """注册页面"""
+    if request.method == 'POST':
+        username = request.form.get('username')
+        email = request.form.get('email')
+        password = request.form.get('password')
+        
+        if User.query.filter_by(username=username).first():
+            flash('用户名已存在', 'danger')
+            return redirect(url_for('auth.register'))
+        
+        if User.query.filter_by(email=email).first():
+            flash('邮箱已被使用', 'danger')
+            return redirect(url_for('auth.register'))
+        
+        user = User(username=username, email=email)
+        try:
+            user.set_password(password)
+        except PasswordHasherBusy as e:
+            flash(str(e), 'warning')
+            return render_template('register.html'), 503
+        
+        db.session.add(user)
+        db.session.commit()
+        
+        flash('注册成功，请登录', 'success')
+        return redirect(url_for('auth.login'))
+    
+    return render_template('register.html')
+
+@bp.route('/logout')
+@login_required
+def logout():
+    """退出登录"""
+    logout_user()
+    flash('已成功退出登录', 'success')
+    return redirect(url_for('main.index'))
@@ -0,0 +1,680 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多进程共享缓存
+
+- 二级存储 (所有 worker 共享)：本地 SQLite 文件 (默认) 或 Redis (可选依赖)
+- 一级缓存 (进程内)：短 TTL 的 LRU 字典，命中时不访问二级存储，耗时为微秒级
+- 标签失效：写入时为条目打标签 (例如 "dreams:public")，invalidate_tags 删除共享存储中的
+  相关条目并清理本进程一级缓存；其他 worker 的一级缓存最多在 CACHE_L1_TTL 秒后失效。
+  每个标签另有版本号，失效时加一；计算开始前记下版本号，写入时版本号已变化则放弃写入，
+  失效前开始 (可能读到旧数据) 的计算不会在失效后写回旧值
+- remember()：防缓存击穿的读取接口
+  * 单飞：同一个键只有一个请求重新计算 (进程内锁 + 共享存储中的租约)，其余请求等待其结果
+  * 概率提前过期 (XFetch)：临近过期时按计算耗时随机提前刷新，避免所有请求在同一时刻过期
+  * 过期后的 stale_timeout 窗口内直接返回旧值，并在后台线程中刷新
+- cached_response()：视图响应缓存，只保存响应体、状态码与少量响应头 (可跨 worker 共享)，
+  键由端点、规范化的查询参数与登录状态组成，并按端点统计命中率
+- FragmentCacheExtension：模板片段缓存 {% cache 键, 有效期[, 标签...] %}...{% endcache %}
+
+缓存读写失败只记录日志并按未命中处理，不影响请求。
+"""
+
+import logging
+import math
+import os
+import pickle
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+from urllib.parse import urlencode
+
+from flask import copy_current_request_context, current_app, has_request_context, make_response, request, session
+from flask_login import current_user
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(prefix, **params):
+    """由前缀与参数生成与参数顺序无关的缓存键，忽略空值"""
+    items = sorted((name, str(value)) for name, value in params.items() if value not in (None, ''))
+    return f'{prefix}?{urlencode(items)}' if items else prefix
+
+
+def request_cache_key(query_args=None):
+    """
+    当前请求的响应缓存键：端点 + 路径 + 排序后的查询参数 + 登录状态
+
+    :param query_args: 参与缓存键的查询参数名；None 表示全部参数
+    """
+    items = sorted(
+        (name, value) for name, values in request.args.lists() for value in values
+        if value.strip() and (query_args is None or name in query_args)
+    )
+    user_id = current_user.get_id() if current_user.is_authenticated else None
+    auth = f'user:{user_id}' if user_id else 'anonymous'
+    return f'response:{request.endpoint}:{request.path}?{urlencode(items)}|{auth}'
+
+
+class Uncacheable(Exception):
+    """视图响应不可缓存 (非 200、写入了会话等)，直接返回该响应"""
+
+    def __init__(self, response):
+        super().__init__(response.status)
+        self.response = response
+
+
+class NullBackend:
+    """不缓存 (CACHE_BACKEND=null)"""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, timeout, tags=(), generations=None):
+        return False
+
+    def add(self, key, value, timeout):
+        return True
+
+    def generations(self, tags):
+        return {}
+
+    def delete(self, key):
+        pass
+
+    def delete_tags(self, tags):
+        pass
+
+    def clear(self):
+        pass
+
+
+class SQLiteBackend:
+    """本机所有 worker 共用的 SQLite 缓存文件 (WAL 模式，读写互不阻塞)"""
+
+    SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS cache_entry (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)',
+        'CREATE TABLE IF NOT EXISTS cache_tag (tag TEXT NOT NULL, key TEXT NOT NULL, PRIMARY KEY (tag, key)) WITHOUT ROWID',
+        'CREATE INDEX IF NOT EXISTS ix_cache_tag_key ON cache_tag (key)',
+        'CREATE TABLE IF NOT EXISTS cache_tag_generation (tag TEXT PRIMARY KEY, generation INTEGER NOT NULL) WITHOUT ROWID',
+    )
+    PURGE_PROBABILITY = 0.01  # 每次写入时以此概率清理过期条目
+
+    def __init__(self, path, busy_timeout=5000):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = self._connection()
+        for statement in self.SCHEMA:
+            connection.execute(statement)
+
+    def _connection(self):
+        """每个线程一个连接 (自动提交模式，写操作显式开启事务)"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or getattr(self._local, 'pid', None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=self.busy_timeout / 1000, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(f'PRAGMA busy_timeout={int(self.busy_timeout)}')
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def get(self, key):
+        row = self._connection().execute(
+            'SELECT value FROM cache_entry WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)',
+            (key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key, value, timeout, tags=(), generations=None):
+        """写入条目；给出 generations 时在同一事务中核对标签版本号，已变化则不写入，返回是否写入"""
+        connection = self._connection()
+        expires_at = time.time() + timeout if timeout else None
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            if generations is not None and self._generations(connection, generations) != generations:
+                connection.execute('ROLLBACK')
+                return False
+            connection.execute('INSERT OR REPLACE INTO cache_entry (key, value, expires_at) VALUES (?, ?, ?)',
+                               (key, value, expires_at))
+            connection.execute('DELETE FROM cache_tag WHERE key = ?', (key,))
+            connection.executemany('INSERT INTO cache_tag (tag, key) VALUES (?, ?)', [(tag, key) for tag in tags])
+            if random.random() < self.PURGE_PROBABILITY:
+                self._purge_expired(connection)
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return True
+
+    def generations(self, tags):
+        return self._generations(self._connection(), tags)
+
+    def _generations(self, connection, tags):
+        tags = tuple(tags)
+        if not tags:
+            return {}
+        placeholders = ', '.join('?' for _ in tags)
+        versions = dict(connection.execute(
+            f'SELECT tag, generation FROM cache_tag_generation WHERE tag IN ({placeholders})', tags
+        ))
+        return {tag: versions.get(tag, 0) for tag in tags}
+
+    def add(self, key, value, timeout):
+        """键不存在 (或已过期) 时写入，返回是否写入成功；用于跨进程互斥"""
+        connection = self._connection()
+        now = time.time()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            connection.execute('DELETE FROM cache_entry WHERE key = ? AND expires_at <= ?', (key, now))
+            cursor = connection.execute(
+                'INSERT OR IGNORE INTO cache_entry (key, value, expires_at) VALUES (?, ?, ?)',
+                (key, value, now + timeout)
+            )
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return cursor.rowcount == 1
+
+    def delete(self, key):
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            connection.execute('DELETE FROM cache_entry WHERE key = ?', (key,))
+            connection.execute('DELETE FROM cache_tag WHERE key = ?', (key,))
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+
+    def delete_tags(self, tags):
+        connection = self._connection()
+        placeholders = ', '.join('?' for _ in tags)
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            keys = [(row[0],) for row in connection.execute(
+                f'SELECT DISTINCT key FROM cache_tag WHERE tag IN ({placeholders})', tuple(tags)
+            )]
+            connection.executemany('DELETE FROM cache_entry WHERE key = ?', keys)
+            connection.executemany('DELETE FROM cache_tag WHERE key = ?', keys)
+            connection.executemany(
+                'INSERT INTO cache_tag_generation (tag, generation) VALUES (?, 1) '
+                'ON CONFLICT (tag) DO UPDATE SET generation = generation + 1',
+                [(tag,) for tag in tags]
+            )
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+
+    def clear(self):
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            connection.execute('DELETE FROM cache_entry')
+            connection.execute('DELETE FROM cache_tag')
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+
+    def _purge_expired(self, connection):
+        keys = [(row[0],) for row in connection.execute(
+            'SELECT key FROM cache_entry WHERE expires_at <= ?', (time.time(),)
+        )]
+        connection.executemany('DELETE FROM cache_entry WHERE key = ?', keys)
+        connection.executemany('DELETE FROM cache_tag WHERE key = ?', keys)
+
+
+class RedisBackend:
+    """本机或局域网 Redis (需要安装 redis 包)；标签以集合保存所属的键"""
+
+    def __init__(self, url, prefix=''):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def _tag_key(self, tag):
+        return f'{self.prefix}tag:{tag}'
+
+    def _generation_key(self, tag):
+        return f'{self.prefix}generation:{tag}'
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value, timeout, tags=(), generations=None):
+        """写入条目；给出 generations 时 WATCH 标签版本号，已变化则不写入，返回是否写入"""
+        import redis
+
+        with self.client.pipeline() as pipeline:
+            try:
+                if generations is not None:
+                    pipeline.watch(*[self._generation_key(tag) for tag in generations])
+                    if self._read_generations(pipeline, generations) != generations:
+                        return False
+                    pipeline.multi()
+                pipeline.set(self.prefix + key, value, ex=int(timeout) if timeout else None)
+                for tag in tags:
+                    pipeline.sadd(self._tag_key(tag), key)
+                pipeline.execute()
+            except redis.WatchError:
+                return False
+        return True
+
+    def generations(self, tags):
+        return self._read_generations(self.client, tags)
+
+    def _read_generations(self, client, tags):
+        tags = tuple(tags)
+        if not tags:
+            return {}
+        values = client.mget([self._generation_key(tag) for tag in tags])
+        return {tag: int(value or 0) for tag, value in zip(tags, values)}
+
+    def add(self, key, value, timeout):
+        return bool(self.client.set(self.prefix + key, value, ex=max(int(timeout), 1), nx=True))
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def delete_tags(self, tags):
+        pipeline = self.client.pipeline()
+        for tag in tags:
+            pipeline.smembers(self._tag_key(tag))
+        keys = {key.decode() for members in pipeline.execute() for key in members}
+        pipeline = self.client.pipeline()
+        if keys or tags:
+            pipeline.delete(*[self.prefix + key for key in keys], *[self._tag_key(tag) for tag in tags])
+        for tag in tags:
+            pipeline.incr(self._generation_key(tag))
+        pipeline.execute()
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=f'{self.prefix}*'))
+        if keys:
+            self.client.delete(*keys)
+
+
+class LocalCache:
+    """进程内一级缓存：短 TTL + LRU 淘汰"""
+
+    def __init__(self, ttl, max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (过期时间, 值, 标签)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)  # 命中的条目最后淘汰
+            return entry
+
+    def set(self, key, value, tags=(), ttl=None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value, frozenset(tags))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def pop_tags(self, tags):
+        tags = set(tags)
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if entry[2] & tags]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class Cache:
+    """共享缓存扩展：cache.init_app(app) 后使用 get / set / delete / invalidate_tags"""
+
+    LOCK_POLL_INTERVAL = 0.05  # 等待其他 worker 计算结果时的轮询间隔(秒)
+
+    def __init__(self):
+        self.backend = NullBackend()
+        self.local = LocalCache(0, 0)
+        self.default_timeout = 300
+        self.stale_timeout = 0
+        self.early_expiration_beta = 1.0
+        self.lock_timeout = 10
+        self._key_locks = {}  # 键 -> [锁, 持有或等待的线程数]，最后一个线程释放时删除
+        self._refreshing = set()
+        self._locks_guard = threading.Lock()
+        self.response_stats = {}  # 端点 -> {'hits': 命中次数, 'misses': 未命中次数} (本进程)
+        self._stats_lock = threading.Lock()
+
+    def init_app(self, app):
+        config = app.config
+        self.backend = create_backend(config, app.instance_path)
+        self.local = LocalCache(config['CACHE_L1_TTL'], config['CACHE_L1_MAX_ENTRIES'])
+        self.default_timeout = config['CACHE_DEFAULT_TIMEOUT']
+        self.stale_timeout = config['CACHE_STALE_TIMEOUT']
+        self.early_expiration_beta = config['CACHE_EARLY_EXPIRATION_BETA']
+        self.lock_timeout = config['CACHE_LOCK_TIMEOUT']
+        app.extensions['dreamecho_cache'] = self
+
+    def get(self, key, default=None):
+        """读取缓存值：先查进程内一级缓存，再查共享存储"""
+        entry = self.local.get(key)
+        if entry is not None:
+            return entry[1]
+        try:
+            data = self.backend.get(key)
+        except Exception as e:
+            logger.warning(f'读取缓存失败 {key}: {e}')
+            return default
+        if data is None:
+            return default
+        value, tags = pickle.loads(data)
+        self.local.set(key, value, tags)
+        return value
+
+    def set(self, key, value, timeout=None, tags=(), generations=None):
+        """
+        写入缓存；tags 用于按标签批量失效
+
+        :param generations: 计算前由 tag_generations(tags) 取得的标签版本号；写入时已变化 (期间发生过失效) 则不写入
+        """
+        timeout = self.default_timeout if timeout is None else timeout
+        tags = tuple(tags)
+        try:
+            stored = self.backend.set(
+                key, pickle.dumps((value, tags), pickle.HIGHEST_PROTOCOL), timeout, tags, generations
+            )
+        except Exception as e:
+            logger.warning(f'写入缓存失败 {key}: {e}')
+            stored = True
+        if stored:
+            self.local.set(key, value, tags, timeout or None)
+
+    def tag_generations(self, tags):
+        """标签当前的版本号 (读取失败或没有标签时返回 None，写入时不核对)"""
+        if not tags:
+            return None
+        try:
+            return self.backend.generations(tags)
+        except Exception as e:
+            logger.warning(f'读取缓存标签版本失败 {tags}: {e}')
+            return None
+
+    def delete(self, key):
+        self.local.pop(key)
+        try:
+            self.backend.delete(key)
+        except Exception as e:
+            logger.warning(f'删除缓存失败 {key}: {e}')
+
+    def invalidate_tags(self, *tags):
+        """删除带有任一标签的条目 (所有 worker 共享存储 + 本进程一级缓存)"""
+        if not tags:
+            return
+        self.local.pop_tags(tags)
+        try:
+            self.backend.delete_tags(tags)
+        except Exception as e:
+            logger.warning(f'按标签失效缓存失败 {tags}: {e}')
+
+    def clear(self):
+        self.local.clear()
+        self.backend.clear()
+
+    def remember(self, key, compute, timeout=None, tags=(), stale_timeout=None):
+        """
+        返回缓存值，未命中时调用 compute() 计算并缓存 (同一个键同时只计算一次)
+
+        :param timeout: 新鲜期(秒)
+        :param stale_timeout: 新鲜期后仍可返回旧值的时间(秒)，期间由后台线程刷新
+        """
+        timeout = self.default_timeout if timeout is None else timeout
+        stale_timeout = self.stale_timeout if stale_timeout is None else stale_timeout
+        entry = self.get(key)
+        if entry is not None:
+            value, fresh_until, delta = entry
+            if not self._should_refresh(fresh_until, delta):
+                return value
+            # 提前过期或处于过期窗口：返回当前值，由一个后台线程刷新
+            self._refresh_in_background(key, compute, timeout, tags, stale_timeout)
+            return value
+        return self._compute_once(key, compute, timeout, tags, stale_timeout)
+
+    def _should_refresh(self, fresh_until, delta):
+        """XFetch：计算耗时 delta 越大、越接近过期，越可能提前刷新"""
+        return time.time() - delta * self.early_expiration_beta * math.log(1.0 - random.random()) >= fresh_until
+
+    def _store(self, key, compute, timeout, tags, stale_timeout):
+        generations = self.tag_generations(tags)
+        started = time.time()
+        value = compute()
+        finished = time.time()
+        self.set(key, (value, finished + timeout, finished - started), timeout + stale_timeout, tags, generations)
+        return value
+
+    @contextmanager
+    def _key_lock(self, key):
+        """进程内按键互斥；锁只在有线程使用期间保留，键的数量不会随请求无限增长"""
+        with self._locks_guard:
+            entry = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._locks_guard:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._key_locks[key]
+
+    def _acquire_lease(self, key):
+        """在共享存储中占用计算租约，防止多个 worker 同时计算同一个键"""
+        try:
+            return self.backend.add(f'lock:{key}', b'1', self.lock_timeout)
+        except Exception as e:
+            logger.warning(f'获取缓存租约失败 {key}: {e}')
+            return True
+
+    def _release_lease(self, key):
+        try:
+            self.backend.delete(f'lock:{key}')
+        except Exception as e:
+            logger.warning(f'释放缓存租约失败 {key}: {e}')
+
+    def _lease_held(self, key):
+        try:
+            return self.backend.get(f'lock:{key}') is not None
+        except Exception as e:
+            logger.warning(f'读取缓存租约失败 {key}: {e}')
+            return False
+
+    def _compute_once(self, key, compute, timeout, tags, stale_timeout):
+        """未命中：本进程内排队，跨进程通过租约等待正在计算的 worker"""
+        with self._key_lock(key):
+            entry = self.get(key)  # 排队期间可能已由其他线程写入
+            if entry is not None:
+                return entry[0]
+            deadline = time.monotonic() + self.lock_timeout
+            while True:
+                if self._acquire_lease(key):
+                    try:
+                        return self._store(key, compute, timeout, tags, stale_timeout)
+                    finally:
+                        self._release_lease(key)
+                while True:
+                    if time.monotonic() >= deadline:
+                        # 持有租约的 worker 超时未写入 (可能已退出)，自行计算
+                        return self._store(key, compute, timeout, tags, stale_timeout)
+                    time.sleep(self.LOCK_POLL_INTERVAL)
+                    entry = self.get(key)
+                    if entry is not None:
+                        return entry[0]
+                    if not self._lease_held(key):
+                        break  # 租约已释放但没有写入 (计算失败或不可缓存)，重新争取租约
+
+    def _refresh_in_background(self, key, compute, timeout, tags, stale_timeout):
+        with self._locks_guard:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        if not self._acquire_lease(key):
+            with self._locks_guard:
+                self._refreshing.discard(key)  # 其他 worker 正在刷新
+            return
+
+        if has_request_context():
+            # 页面渲染依赖请求上下文 (url_for、current_user 等)
+            run = copy_current_request_context(compute)
+        else:
+            app = current_app._get_current_object()
+
+            def run():
+                with app.app_context():
+                    return compute()
+
+        def refresh():
+            try:
+                self._store(key, run, timeout, tags, stale_timeout)
+            except Uncacheable:
+                pass  # 保留旧值，到期后由前台请求重新计算
+            except Exception as e:
+                logger.warning(f'后台刷新缓存失败 {key}: {e}')
+            finally:
+                self._release_lease(key)
+                with self._locks_guard:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    # 响应缓存只保存这些响应头，Set-Cookie 等与会话相关的头不会被共享
+    CACHED_HEADERS = ('Content-Type', 'Content-Language', 'Vary')
+
+    def cached_response(self, timeout=None, tags=(), query_args=None, stale_timeout=None):
+        """
+        视图响应缓存装饰器 (仅 GET/HEAD)，响应头 X-Cache 标明 HIT / MISS
+
+        会话中有待显示的 flash 消息时跳过缓存；视图返回非 200 或修改了会话时不缓存。
+
+        :param tags: 失效标签，例如 ('dreams:public',)
+        :param query_args: 影响页面内容的查询参数名；其他参数不参与缓存键，避免缓存碎片化
+        """
+        def decorator(view):
+            @wraps(view)
+            def decorated_view(*args, **kwargs):
+                if request.method not in ('GET', 'HEAD') or '_flashes' in session:
+                    return view(*args, **kwargs)
+
+                foreground = threading.get_ident()
+                computed = []
+
+                def compute():
+                    response = make_response(view(*args, **kwargs))
+                    if threading.get_ident() == foreground:
+                        computed.append(True)
+                    if response.status_code != 200 or response.direct_passthrough or session.modified:
+                        raise Uncacheable(response)
+                    headers = [(name, value) for name, value in response.headers.items() if name in self.CACHED_HEADERS]
+                    return response.get_data(), response.status_code, headers
+
+                try:
+                    body, status, headers = self.remember(
+                        request_cache_key(query_args), compute, timeout, tags, stale_timeout
+                    )
+                except Uncacheable as e:
+                    return e.response
+                self._record_response(request.endpoint, hit=not computed)
+                response = current_app.response_class(body, status=status, headers=headers)
+                response.headers['X-Cache'] = 'MISS' if computed else 'HIT'
+                return response
+            return decorated_view
+        return decorator
+
+    def _record_response(self, endpoint, hit):
+        with self._stats_lock:
+            stats = self.response_stats.setdefault(endpoint, {'hits': 0, 'misses': 0})
+            stats['hits' if hit else 'misses'] += 1
+
+    def response_hit_ratio(self):
+        """各端点响应缓存的命中次数、未命中次数与命中率 (本进程)"""
+        with self._stats_lock:
+            return {
+                endpoint: dict(stats, hit_ratio=round(stats['hits'] / ((stats['hits'] + stats['misses']) or 1), 4))
+                for endpoint, stats in self.response_stats.items()
+            }
+
+
+def create_backend(config, instance_path):
+    """按 CACHE_BACKEND 创建共享存储"""
+    name = config['CACHE_BACKEND']
+    if name == 'sqlite':
+        return SQLiteBackend(config['CACHE_SQLITE_PATH'] or os.path.join(instance_path, 'cache.db'))
+    if name == 'redis':
+        return RedisBackend(config['CACHE_REDIS_URL'], config['CACHE_KEY_PREFIX'])
+    if name == 'null':
+        return NullBackend()
+    raise ValueError(f'不支持的 CACHE_BACKEND: {name}')
+
+
+class FragmentCacheExtension(Extension):
+    """
+    模板片段缓存，使用应用的共享缓存 (未初始化缓存时直接渲染)
+
+        {% cache 'index:recent_models', 300, 'dreams:public' %} ... {% endcache %}
+
+    键由模板名、模板文件修改时间与给定的键组成，修改模板后旧片段自动失效；
+    片段内不应使用与当前用户相关的变量，需要区分时把区分条件写进键里。
+    """
+
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            args.append(parser.parse_expression())
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+
+        version = parser.name or ''
+        if parser.filename and os.path.exists(parser.filename):
+            version = f'{version}@{os.stat(parser.filename).st_mtime_ns}'
+        call = self.call_method('_render_fragment', [nodes.Const(version), nodes.List(args)])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _render_fragment(self, version, args, caller):
+        key, timeout, *tags = args
+        cache = current_app.extensions.get('dreamecho_cache')
+        if cache is None:
+            return caller()
+        key = f'fragment:{version}:{key}'
+        html = cache.get(key)
+        if html is None:
+            generations = cache.tag_generations(tags)
+            html = str(caller())
+            cache.set(key, html, timeout, tags, generations)
+        return Markup(html)
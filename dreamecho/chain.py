@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+区块链适配器
+
+CHAIN_ADAPTER 指定适配器类 ('模块:类名')，默认使用本地模拟器 SimulatedChain。
+适配器需实现 init_app(app) 与 mint_batch(tokens)：在一笔交易中铸造全部 token，阻塞到交易确认后
+返回交易哈希，失败时抛出 MintError (整批失败)。
+"""
+
+import importlib
+import random
+import secrets
+import threading
+import time
+
+from flask import current_app
+
+_lock = threading.Lock()
+
+
+class MintError(Exception):
+    """铸造交易失败 (消息可直接展示给用户)"""
+
+
+class SimulatedChain:
+    """本地模拟链：随机延迟后确认交易，按配置的概率失败"""
+
+    ERRORS = ('网络拥堵，请稍后重试', 'Gas 费不足', '合约调用失败')
+
+    def __init__(self):
+        self.min_delay = 3
+        self.max_delay = 8
+        self.failure_rate = 0.2
+
+    def init_app(self, app):
+        self.min_delay = app.config['CHAIN_SIMULATOR_MIN_DELAY']
+        self.max_delay = app.config['CHAIN_SIMULATOR_MAX_DELAY']
+        self.failure_rate = app.config['CHAIN_SIMULATOR_FAILURE_RATE']
+
+    def mint(self, token):
+        """铸造单个 NFT"""
+        return self.mint_batch([token])
+
+    def mint_batch(self, tokens):
+        """
+        在一笔交易中铸造多个 NFT，只等待一次确认
+
+        :param tokens: [{'dream_id', 'owner', 'blockchain', 'title'}, ...]
+        :return: 交易哈希
+        """
+        time.sleep(random.uniform(self.min_delay, self.max_delay))
+        if random.random() < self.failure_rate:
+            raise MintError(random.choice(self.ERRORS))
+        return '0x' + secrets.token_hex(32)
+
+
+def get_chain(app=None):
+    """返回应用的区块链适配器实例 (首次调用时按 CHAIN_ADAPTER 导入并初始化)"""
+    app = app or current_app._get_current_object()
+    chain = app.extensions.get('chain')
+    if chain is None:
+        with _lock:
+            if 'chain' not in app.extensions:
+                module_name, _, class_name = app.config['CHAIN_ADAPTER'].partition(':')
+                chain = getattr(importlib.import_module(module_name), class_name)()
+                chain.init_app(app)
+                app.extensions['chain'] = chain
+            chain = app.extensions['chain']
+    return chain
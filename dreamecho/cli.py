@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+命令行工具: flask init-db / create-admin / check-schema / sync-replica /
+rebuild-tag-facets / release-stale-mints / dreams export|import
+
+建表与初始数据只在这里执行，导入应用时不访问数据库。
+"""
+
+import sys
+
+import click
+from flask.cli import AppGroup, with_appcontext
+
+from .database import schema_differences, sync_sqlite_replica
+from .dream_io import FORMATS, export_rows, import_rows
+from .extensions import db
+from .minting import release_stale_claims
+from .models import Dream, User, dream_tag, get_or_create_tags, parse_tags, rebuild_tag_facets
+
+def seed_admin(username='123', email='admin@example.com', password='123'):
+    """创建测试管理员账号 (已存在时跳过)，返回是否新建"""
+    if User.query.filter_by(username=username).first():
+        return False
+    admin = User(username=username, email=email, is_active=True, is_admin=True)
+    admin.set_password(password)
+    db.session.add(admin)
+    db.session.commit()
+    return True
+
+@click.command("init-db")
+@click.option('--seed/--no-seed', default=True, help='是否创建测试管理员账号')
+@with_appcontext
+def init_db_command(seed):
+    """创建数据库表 (未使用迁移的本地环境) 并写入初始数据"""
+    db.create_all()
+    print('数据库表已创建')
+    if seed:
+        print('管理员用户创建成功' if seed_admin() else '管理员用户已存在')
+
+@click.command("create-admin")
+@with_appcontext
+def create_admin():
+    """创建管理员账号"""
+    admin = User(
+        username='123',
+        email='123@example.com',
+        is_active=True,
+        is_admin=True
+    )
+    admin.set_password('123')
+    db.session.add(admin)
+    db.session.commit()
+    print('测试账号创建成功！用户名和密码都是：123')
+
+@click.command("check-schema")
+@with_appcontext
+def check_schema():
+    """检查迁移后的数据库结构是否与模型一致 (可指向 PostgreSQL 验证)"""
+    differences = schema_differences(db)
+    for difference in differences:
+        print(difference)
+    if differences:
+        print(f'数据库结构与模型存在 {len(differences)} 处差异')
+        sys.exit(1)
+    print(f'数据库结构与模型一致 ({db.engine.dialect.name})')
+
+@click.command("sync-replica")
+@with_appcontext
+def sync_replica():
+    """将 SQLite 主库复制到 SQLite 只读副本 (本地模拟读写分离)"""
+    sync_sqlite_replica(db)
+    print('只读副本已同步')
+
+@click.command("rebuild-tag-facets")
+@with_appcontext
+def rebuild_tag_facets_command():
+    """重建标签分面计数"""
+    count = rebuild_tag_facets()
+    print(f'标签分面计数已重建，共 {count} 条')
+
+@click.command("release-stale-mints")
+@with_appcontext
+def release_stale_mints():
+    """将认领超时 (进程中断) 仍为 minting 的梦境恢复为 complete"""
+    count = release_stale_claims()
+    print(f'已释放 {count} 个超时的铸造认领')
+
+# --- 批量导入导出: flask dreams export / flask dreams import ---
+dreams_cli = AppGroup('dreams', help='梦境与用户数据批量导入导出 (NDJSON/CSV)')
+
+IO_TABLES = {'users': User.__table__, 'dreams': Dream.__table__}
+
+def report_progress(message):
+    click.echo(message, err=True)
+
+def link_imported_dream_tags(rows):
+    """为一批导入的梦境建立规范化标签关联 (分面计数在导入结束后统一重建)"""
+    row_tags = [(row['id'], parse_tags(row.get('tags'))) for row in rows if row.get('id')]
+    names = sorted({name for _, tag_names in row_tags for name in tag_names})
+    if not names:
+        return
+    tags = get_or_create_tags(names)
+    db.session.flush()
+    tag_ids = {tag.name: tag.id for tag in tags}
+    db.session.execute(dream_tag.insert(), [
+        {'dream_id': dream_id, 'tag_id': tag_ids[name]}
+        for dream_id, tag_names in row_tags for name in tag_names
+    ])
+
+@dreams_cli.command('export')
+@click.option('--table', 'table_name', type=click.Choice(list(IO_TABLES)), default='dreams', help='导出的表')
+@click.option('--format', 'fmt', type=click.Choice(FORMATS), default='ndjson', help='输出格式')
+@click.option('--output', default='-', help='输出文件，默认标准输出')
+@click.option('--offset', default=0, help='跳过前N行 (续传时输出文件以追加方式打开)')
+@click.option('--batch-size', default=1000, help='每批读取行数')
+def export_command(table_name, fmt, output, offset, batch_size):
+    """流式导出用户或梦境数据"""
+    if output == '-':
+        count = export_rows(db, IO_TABLES[table_name], sys.stdout, fmt, offset, batch_size, report_progress)
+    else:
+        with open(output, 'a' if offset else 'w', encoding='utf-8', newline='') as out:
+            count = export_rows(db, IO_TABLES[table_name], out, fmt, offset, batch_size, report_progress)
+    report_progress(f'导出完成，共 {count} 行')
+
+@dreams_cli.command('import')
+@click.option('--table', 'table_name', type=click.Choice(list(IO_TABLES)), default='dreams', help='导入的表 (先导入 users)')
+@click.option('--format', 'fmt', type=click.Choice(FORMATS), default='ndjson', help='输入格式')
+@click.option('--input', 'input_path', required=True, help='输入文件，- 表示标准输入')
+@click.option('--offset', default=0, help='跳过前N条记录 (用于中断后续传)')
+@click.option('--batch-size', default=1000, help='每批插入并提交的行数')
+def import_command(table_name, fmt, input_path, offset, batch_size):
+    """分批导入用户或梦境数据"""
+    after_batch = link_imported_dream_tags if table_name == 'dreams' else None
+    try:
+        if input_path == '-':
+            count = import_rows(db, IO_TABLES[table_name], sys.stdin, fmt, offset, batch_size, after_batch, report_progress)
+        else:
+            with open(input_path, encoding='utf-8', newline='') as infile:
+                count = import_rows(db, IO_TABLES[table_name], infile, fmt, offset, batch_size, after_batch, report_progress)
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+    if table_name == 'dreams':
+        rebuild_tag_facets()
+    report_progress(f'导入完成，共 {count} 条记录')
+
+
+def init_app(app):
+    """注册命令"""
+    for command in (init_db_command, create_admin, check_schema, sync_replica,
+                    rebuild_tag_facets_command, release_stale_mints, dreams_cli):
+        app.cli.add_command(command)
@@ -0,0 +1,550 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+梦境转3D模型：DeepSeek 梦境分析 + Tripo 模型生成
+
+依赖 requests / tenacity / tqdm，只在后台处理梦境时才导入本模块。
+"""
+
+import contextvars
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+import requests
+import tenacity
+from flask import current_app
+from tqdm import tqdm
+
+from . import metrics
+from .analysis_parser import AnalysisFormatError, StreamingAnalysis, parse_analyses, parse_analysis
+from .progress import update_dream_progress
+from .stage_timing import StageTimer
+
+logger = logging.getLogger(__name__)
+
+# 生成 Tripo 提示词需要的字段；流式分析中这些字段完整后即可创建模型任务
+PROMPT_FIELDS = ('visual_description', 'symbols', 'emotions')
+
+ANALYST_SYSTEM_PROMPT = "你是一个专业的梦境分析师，擅长提取梦境中的关键元素和象征意义。请直接返回JSON格式的结果，不要添加任何Markdown格式。"
+ANALYSIS_ITEMS = """1. 5-8个最能代表这个梦境的关键词或短语
+        2. 3-5个梦境中的核心象征物或场景
+        3. 这个梦境可能传达的主要情感或感受
+        4. 一个能够视觉化表达这个梦境的简短描述(50字以内)
+        5. 对这个梦境的心理学解析(200字以内)"""
+
+BATCH_SIZES = metrics.histogram(
+    'dreamecho_analysis_batch_size', '每次 DeepSeek 批量分析请求包含的梦境数', buckets=(1, 2, 3, 4, 5, 6, 7, 8, 12, 16)
+)
+BATCH_FALLBACKS = metrics.counter('dreamecho_analysis_batch_fallbacks', '批量分析中未得到结果、改为单独请求的梦境数')
+
+
+class BatchAnalyzer:
+    """
+    合并短时间内到达的梦境分析请求 (进程内)
+
+    有其他梦境正在分析时，新到达的梦境最多等待 ANALYSIS_BATCH_WINDOW_MS 毫秒；第二个梦境加入后
+    窗口缩短为 ANALYSIS_BATCH_LINGER_MS (收集同一波到达的梦境)，凑满 ANALYSIS_BATCH_SIZE 个时立即发出。
+    整批以一次请求分析 (返回带 id 的 JSON 数组)，再把结果分发给各个等待的处理线程。
+    空闲时到达的梦境不等待窗口；本批只有一个梦境、请求失败或超时、某个梦境的结果无法解析时，
+    由调用方单独 (流式) 请求。
+    """
+
+    def __init__(self):
+        self.api_base = None
+        self.api_key = None
+        self.batch_size = 1
+        self.window = 0.25
+        self.linger = 0.01
+        self._pending = []
+        self._timer = None
+        self._active = 0  # 正在分析 (批量或单独请求) 的梦境数
+        self._lock = threading.Lock()
+
+    def configure(self, api_base, api_key, batch_size, window_ms, linger_ms=10):
+        self.api_base = api_base
+        self.api_key = api_key
+        self.batch_size = batch_size
+        self.window = window_ms / 1000
+        self.linger = min(linger_ms, window_ms) / 1000
+
+    @staticmethod
+    def request_timeout(count):
+        return 90 + 15 * count
+
+    def analyze(self, dream_text, solo):
+        """批量分析一个梦境，没有得到结果时调用 solo() 单独请求"""
+        if self.batch_size <= 1:
+            return solo()
+        with self._lock:
+            self._active += 1
+        try:
+            analysis = self.submit(dream_text)
+            return analysis if analysis is not None else solo()
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    def submit(self, dream_text):
+        """加入当前批次并等待结果；返回分析结果或 None"""
+        if self.batch_size <= 1:
+            return None
+        future = Future()
+        with self._lock:
+            batch = self._pending
+            if not batch and self._active <= 1:
+                return None  # 没有其他梦境在分析，不等待窗口
+            batch.append((dream_text, future))
+            full = len(batch) >= self.batch_size
+            if full:
+                self._pending = []
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            elif len(batch) <= 2:
+                # 第一个梦境开启窗口；第二个梦境到达后只再等待 linger，不必等满整个窗口
+                if self._timer is not None:
+                    self._timer.cancel()
+                self._timer = threading.Timer(self.window if len(batch) == 1 else self.linger,
+                                              self._flush, args=(batch,))
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self._dispatch(batch)
+        try:
+            return future.result(timeout=self.window + self.request_timeout(self.batch_size))
+        except FutureTimeoutError:
+            BATCH_FALLBACKS.inc()
+            logger.warning('批量分析超时，改为单独请求')
+            return None
+
+    def _flush(self, batch):
+        """等待窗口结束；批次已因凑满而发出时不做处理"""
+        with self._lock:
+            if self._pending is not batch:
+                return
+            self._pending = []
+            self._timer = None
+        self._dispatch(batch)
+
+    def _dispatch(self, batch):
+        BATCH_SIZES.observe(len(batch))
+        if len(batch) == 1:
+            batch[0][1].set_result(None)
+            return
+        threading.Thread(target=self._run, args=(batch,), name='analysis-batch', daemon=True).start()
+
+    def _run(self, batch):
+        try:
+            results = self.request_batch([dream_text for dream_text, _ in batch])
+        except Exception as e:
+            logger.warning(f'批量分析 {len(batch)} 个梦境失败，改为逐个请求: {str(e)}')
+            results = {}
+        for number, (_, future) in enumerate(batch, 1):
+            analysis = results.get(str(number))
+            if analysis is None:
+                BATCH_FALLBACKS.inc()
+            future.set_result(analysis)
+
+    def request_batch(self, dream_texts):
+        """一次请求分析多个梦境，返回 {str(序号): 分析结果} (序号从 1 开始)"""
+        dreams = "\n\n".join(f"[id={number}]\n{dream_text}" for number, dream_text in enumerate(dream_texts, 1))
+        prompt = f"""
+        请分别分析以下 {len(dream_texts)} 个梦境描述，对每个梦境提取以下内容:
+        {ANALYSIS_ITEMS}
+
+        请以JSON数组返回结果，每个梦境一个元素，包含字段: id (梦境前面标注的编号), keywords, symbols, emotions, visual_description, interpretation
+
+        梦境描述:
+        {dreams}
+        """
+        response = requests.post(
+            f"{self.api_base}/chat/completions",
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {self.api_key}"
+            },
+            json={
+                "model": "deepseek-chat",
+                "messages": [
+                    {"role": "system", "content": ANALYST_SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                "temperature": 0.3,
+                "max_tokens": 8192
+            },
+            timeout=self.request_timeout(len(dream_texts))
+        )
+        if response.status_code != 200:
+            raise Exception(f"DeepSeek API 调用失败，状态码: {response.status_code}")
+        return parse_analyses(response.json()["choices"][0]["message"]["content"])
+
+
+batch_analyzer = BatchAnalyzer()
+
+# 流式分析中提前创建 Tripo 任务的线程池，不阻塞读取流式输出
+TASK_CREATE_WORKERS = 4
+_task_executor = None
+_task_executor_pid = None
+_task_executor_lock = threading.Lock()
+
+
+def task_executor():
+    global _task_executor, _task_executor_pid
+    with _task_executor_lock:
+        if _task_executor is None or _task_executor_pid != os.getpid():
+            _task_executor = ThreadPoolExecutor(max_workers=TASK_CREATE_WORKERS, thread_name_prefix='tripo-task')
+            _task_executor_pid = os.getpid()
+        return _task_executor
+
+
+class DreamToModelConverter:
+    def __init__(self, deepseek_api_key=None, tripo_api_key=None):
+        self.deepseek_api_key = deepseek_api_key or current_app.config['DEEPSEEK_API_KEY']
+        self.tripo_api_key = tripo_api_key or current_app.config['TRIPO_API_KEY']
+        self.deepseek_api_base = current_app.config['DEEPSEEK_API_BASE'].rstrip('/')
+        self.tripo_api_base = current_app.config['TRIPO_API_BASE'].rstrip('/')
+        self.tripo_poll_interval = current_app.config['TRIPO_POLL_INTERVAL']
+        self.deepseek_stream = current_app.config['DEEPSEEK_STREAM']
+        self.analysis_flush_interval = current_app.config['ANALYSIS_FLUSH_INTERVAL']
+        self.timer = StageTimer()
+        batch_analyzer.configure(
+            self.deepseek_api_base, self.deepseek_api_key,
+            current_app.config['ANALYSIS_BATCH_SIZE'], current_app.config['ANALYSIS_BATCH_WINDOW_MS'],
+            current_app.config['ANALYSIS_BATCH_LINGER_MS']
+        )
+
+        if not self.deepseek_api_key:
+            print("错误: 未设置DEEPSEEK_API_KEY环境变量")
+            sys.exit(1)
+
+        if not self.tripo_api_key:
+            print("警告: 未设置TRIPO_API_KEY环境变量，将无法生成3D模型")
+
+    def test_deepseek_api(self):
+        """测试 DeepSeek API 是否可用"""
+        try:
+            response = requests.post(
+                f"{self.deepseek_api_base}/chat/completions",
+                headers={
+                    "Content-Type": "application/json",
+                    "Authorization": f"Bearer {self.deepseek_api_key}"
+                },
+                json={
+                    "model": "deepseek-chat",
+                    "messages": [
+                        {"role": "user", "content": "你好，这是一个测试请求，请回复 '测试成功'"}
+                    ],
+                    "temperature": 0.3
+                },
+                timeout=30
+            )
+            return response.status_code == 200
+        except Exception:
+            return False
+
+    @tenacity.retry(
+        wait=tenacity.wait_fixed(10),  # 每次重试等待10秒
+        stop=tenacity.stop_after_attempt(5),  # 最多重试5次
+        # 输出无法解析时重新请求，而不是让整个梦境失败
+        retry=tenacity.retry_if_exception_type(
+            (requests.exceptions.Timeout, requests.exceptions.ConnectionError, AnalysisFormatError)
+        ),
+        reraise=True
+    )
+    def extract_keywords(self, dream_text, on_update=None):
+        """
+        使用DeepSeek API从梦境文本中提取关键词、象征意义和解梦
+
+        DEEPSEEK_STREAM 开启时使用流式输出，每收到一段文本以增量解析器调用 on_update(parser)
+        (StreamingAnalysis，parser.fields 为已完整的字段)
+        """
+        prompt = f"""
+        请分析以下梦境描述，并提取以下内容:
+        {ANALYSIS_ITEMS}
+
+        请以JSON格式返回结果，包含字段: keywords, symbols, emotions, visual_description, interpretation
+        请按 keywords, symbols, emotions, visual_description, interpretation 的顺序输出字段
+
+        梦境描述:
+        {dream_text}
+        """
+
+        try:
+            response = requests.post(
+                f"{self.deepseek_api_base}/chat/completions",
+                headers={
+                    "Content-Type": "application/json",
+                    "Authorization": f"Bearer {self.deepseek_api_key}"
+                },
+                json={
+                    "model": "deepseek-chat",
+                    "messages": [
+                        {"role": "system", "content": ANALYST_SYSTEM_PROMPT},
+                        {"role": "user", "content": prompt}
+                    ],
+                    "temperature": 0.3,
+                    "stream": self.deepseek_stream
+                },
+                stream=self.deepseek_stream,
+                timeout=90  # 增加超时时间至90秒 (流式输出时为相邻两段之间的最长等待)
+            )
+
+            with response:
+                if response.status_code != 200:
+                    raise Exception(f"DeepSeek API 调用失败，状态码: {response.status_code}")
+
+                if response.headers.get('Content-Type', '').startswith('text/event-stream'):
+                    parser = StreamingAnalysis()
+                    for content in self.iter_stream_content(response):
+                        parser.feed(content)
+                        if on_update:
+                            on_update(parser)
+                    content = parser.text
+                else:
+                    result = response.json()
+                    content = result["choices"][0]["message"]["content"]
+
+            # 容忍说明文字、代码块与常见格式问题，并校验必需字段
+            return parse_analysis(content)
+
+        except AnalysisFormatError as e:
+            current_app.logger.warning(f'DeepSeek 返回格式无法解析，将重新请求: {str(e)}')
+            raise
+        except requests.exceptions.Timeout:
+            raise
+        except Exception as e:
+            raise
+
+    @staticmethod
+    def iter_stream_content(response):
+        """逐段取出流式响应 (SSE：data: {...} ... data: [DONE]) 中的文本增量"""
+        for line in response.iter_lines():
+            if not line.startswith(b'data:'):
+                continue
+            data = line[5:].strip()
+            if data == b'[DONE]':
+                break
+            choices = json.loads(data).get('choices') or [{}]
+            content = (choices[0].get('delta') or {}).get('content')
+            if content:
+                yield content
+
+    @staticmethod
+    def generate_model_prompt(analysis):
+        """根据分析结果生成3D模型提示词"""
+        symbols = ", ".join(analysis["symbols"])
+        emotions = ", ".join(analysis["emotions"])
+        model_prompt = f"{analysis['visual_description']} 包含 {symbols}. 整体氛围: {emotions}"
+        return model_prompt
+
+    def generate_3d_model(self, model_prompt):
+        """使用Tripo API生成3D模型，返回模型下载地址"""
+        task_id = self.create_model_task(model_prompt)
+        return self.await_model(task_id) if task_id else None
+
+    def create_model_task(self, model_prompt):
+        """创建 Tripo 任务，返回任务ID (失败返回 None)"""
+        try:
+            with self.timer.span('task_create') as span:
+                response = requests.post(
+                    f"{self.tripo_api_base}/task",
+                    headers={
+                        "Content-Type": "application/json",
+                        "Authorization": f"Bearer {self.tripo_api_key}"
+                    },
+                    json={
+                        "type": "text_to_model",
+                        "prompt": model_prompt
+                    },
+                    timeout=30
+                )
+                task_id = response.json().get("data", {}).get("task_id") if response.status_code == 200 else None
+                if not task_id:
+                    span.fail()
+                return task_id
+        except Exception:
+            return None
+
+    def await_model(self, task_id):
+        """轮询任务状态，返回模型下载地址 (模型文件由 process_dream 下载到用户目录)"""
+        try:
+            with self.timer.span('poll_wait') as span:
+                model_url = self.wait_for_model(task_id)
+                if not model_url:
+                    span.fail()
+                return model_url
+        except Exception:
+            return None
+
+    def wait_for_model(self, task_id):
+        """轮询 Tripo 任务直到完成，返回模型下载地址 (失败或超时返回 None)"""
+        max_attempts = 60
+        for attempt in range(max_attempts):
+            time.sleep(self.tripo_poll_interval)
+            status_response = requests.get(
+                f"{self.tripo_api_base}/task/{task_id}",
+                headers={"Authorization": f"Bearer {self.tripo_api_key}"},
+                timeout=30
+            )
+
+            if status_response.status_code != 200:
+                continue
+
+            status_data = status_response.json()
+            task_status = status_data.get("data", {}).get("status")
+
+            if task_status == "success":
+                data = status_data.get("data", {})
+                output = data.get("output", {})
+                result = data.get("result", {})
+
+                return (
+                    output.get("pbr_model") or
+                    output.get("model") or
+                    result.get("pbr_model", {}).get("url") or
+                    result.get("model", {}).get("url")
+                )
+            elif task_status in ["failed", "cancelled", "unknown"]:
+                return None
+        return None
+
+    def process_dream(self, dream_text, user_id, dream_id=None, on_analysis=None):
+        """
+        处理梦境并生成3D模型 (各阶段耗时记入 self.timer，结束时写入数据库)
+
+        流式分析时，提示词所需字段一完整就在线程池中创建 Tripo 任务，与剩余的分析输出同时进行；
+        on_analysis(fields) 按 ANALYSIS_FLUSH_INTERVAL 收到已得到的分析字段 (interpretation 可能只是前缀)，
+        用于提前写入数据库
+        """
+        self.timer = StageTimer(dream_id)
+        try:
+            current_app.logger.info(f'开始处理用户 {user_id} 的梦境')
+            
+            # 如果提供了dream_id，则初始化进度跟踪
+            if dream_id:
+                update_dream_progress(dream_id, "开始", 5, 20, "正在启动梦境处理...")
+            
+            # 测试 DeepSeek API 可用性
+            with self.timer.span('probe') as span:
+                available = self.test_deepseek_api()
+                if not available:
+                    span.fail()
+            if not available:
+                current_app.logger.error('DeepSeek API 不可用')
+                if dream_id:
+                    update_dream_progress(dream_id, "失败", 0, 0, "API服务暂时不可用，请稍后再试")
+                raise Exception("DeepSeek API 服务暂时不可用，请稍后再试")
+
+            # 提取关键词和分析
+            current_app.logger.info('开始提取关键词和分析')
+            if dream_id:
+                update_dream_progress(dream_id, "分析梦境", 20, 15, "正在提取关键词和进行梦境分析...")
+            model_task = {}
+            flushed = {'at': 0.0}
+
+            def on_update(parser):
+                # 重试时沿用第一次创建的任务
+                if 'future' not in model_task and parser.has(PROMPT_FIELDS):
+                    current_app.logger.info('提示词所需字段已完整，提前创建3D模型任务')
+                    # 在线程池中创建 (沿用日志上下文中的 dream_id)，不阻塞读取流式输出，
+                    # task_create 的耗时也不再计入 extract_keywords
+                    model_task['future'] = task_executor().submit(
+                        contextvars.copy_context().run, self.create_model_task,
+                        self.generate_model_prompt(parser.fields)
+                    )
+                if on_analysis and time.monotonic() - flushed['at'] >= self.analysis_flush_interval:
+                    fields = dict(parser.fields)
+                    interpretation = parser.partial('interpretation')
+                    if interpretation:
+                        fields['interpretation'] = interpretation
+                    if fields:
+                        on_analysis(fields)
+                        flushed['at'] = time.monotonic()
+
+            with self.timer.span('extract_keywords'):
+                # 与同时到达的梦境合并为一次请求；未能批量分析时单独 (流式) 请求
+                analysis = batch_analyzer.analyze(dream_text, lambda: self.extract_keywords(dream_text, on_update))
+            if on_analysis:
+                on_analysis(analysis)
+            
+            # 生成3D模型 (流式分析中未能提前创建任务时在此创建)
+            current_app.logger.info('开始生成3D模型')
+            if dream_id:
+                update_dream_progress(dream_id, "生成模型", 40, 10, "正在生成3D模型...")
+            # 等待提前提交的任务创建完成 (create_model_task 受请求超时限制)
+            task_id = model_task['future'].result() if 'future' in model_task else None
+            task_id = task_id or self.create_model_task(self.generate_model_prompt(analysis))
+            model_url = self.await_model(task_id) if task_id else None
+            
+            if not model_url:
+                current_app.logger.error('3D模型生成失败')
+                if dream_id:
+                    update_dream_progress(dream_id, "失败", 0, 0, "3D模型生成失败，请稍后重试")
+                raise Exception("3D模型生成失败，请稍后重试")
+
+            # 创建用户目录
+            user_dir = os.path.join('static', 'models', f'user_{user_id}')
+            os.makedirs(user_dir, exist_ok=True)
+            
+            # 下载模型文件
+            current_app.logger.info('下载模型文件')
+            if dream_id:
+                update_dream_progress(dream_id, "下载模型", 60, 5, "正在下载生成的模型文件...")
+            model_filename = f"dream_{int(time.time())}.glb"  # 使用GLB格式
+            model_path = os.path.join(user_dir, model_filename)
+            
+            with self.timer.span('download'):
+                response = requests.get(model_url, stream=True)
+                if response.status_code != 200:
+                    if dream_id:
+                        update_dream_progress(dream_id, "失败", 0, 0, "下载模型文件失败")
+                    raise Exception("下载模型文件失败")
+                
+                total_size = int(response.headers.get('content-length', 0))
+                block_size = 1024
+                
+                with open(model_path, 'wb') as f, tqdm(
+                    desc="下载模型",
+                    total=total_size,
+                    unit='iB',
+                    unit_scale=True,
+                    unit_divisor=1024,
+                ) as pbar:
+                    for data in response.iter_content(block_size):
+                        size = f.write(data)
+                        pbar.update(size)
+            
+            # 优化模型处理
+            if dream_id:
+                update_dream_progress(dream_id, "优化处理", 80, 3, "正在优化模型和处理资源...")
+            
+            with self.timer.span('post_process'):
+                # 构建相对路径
+                relative_model_path = os.path.join('models', f'user_{user_id}', model_filename)
+                
+                # 返回结果字典
+                result = {
+                    'model_path': relative_model_path,
+                    'keywords': json.dumps(analysis['keywords']),
+                    'symbols': json.dumps(analysis['symbols']),
+                    'emotions': json.dumps(analysis['emotions']),
+                    'visual_description': analysis['visual_description'],
+                    'interpretation': analysis['interpretation']
+                }
+            
+            current_app.logger.info(f'梦境处理完成，模型路径: {relative_model_path}')
+            return result
+            
+        except Exception as e:
+            current_app.logger.error(f'处理梦境时发生错误: {str(e)}')
+            # 更新失败状态
+            if dream_id:
+                update_dream_progress(dream_id, "失败", 0, 0, f"处理失败: {str(e)}")
+            raise
+        finally:
+            self.timer.save()
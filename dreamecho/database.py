@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据库引擎配置
+
+所有应用入口统一通过 init_database(app, db) 初始化数据库：
+- 连接池大小、溢出、超时、回收与 pre-ping 由配置决定
+- SQLite 在每个新连接上设置 WAL、synchronous、busy_timeout、mmap_size、cache_size，
+  避免后台处理线程与请求线程互相阻塞在数据库锁上
+- 配置了 DATABASE_REPLICA_URL 时注册只读副本 bind，用 @use_replica 标记的视图中
+  的只读查询由 RoutingSession 路由到副本，写入始终走主库
+
+应用未设置的配置项取 config.Config 中的默认值。
+"""
+
+from functools import wraps
+
+from flask import g, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.sql import Select
+
+from config import Config
+
+REPLICA_BIND = 'replica'
+
+DATABASE_SETTINGS = (
+    'DATABASE_REPLICA_URL',
+    'DATABASE_POOL_SIZE',
+    'DATABASE_MAX_OVERFLOW',
+    'DATABASE_POOL_TIMEOUT',
+    'DATABASE_POOL_RECYCLE',
+    'DATABASE_POOL_PRE_PING',
+    'SQLITE_JOURNAL_MODE',
+    'SQLITE_SYNCHRONOUS',
+    'SQLITE_BUSY_TIMEOUT',
+    'SQLITE_MMAP_SIZE',
+    'SQLITE_CACHE_SIZE',
+)
+
+JOURNAL_MODES = {'DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF'}
+SYNCHRONOUS_LEVELS = {'OFF', 'NORMAL', 'FULL', 'EXTRA'}
+
+
+def is_memory_sqlite(url):
+    """是否为内存 SQLite 数据库 (只能使用单连接的 StaticPool)"""
+    url = make_url(url)
+    if url.get_backend_name() != 'sqlite':
+        return False
+    return url.database in (None, '', ':memory:') or url.query.get('mode') == 'memory'
+
+
+def engine_options(config, url):
+    """根据配置生成 create_engine 参数"""
+    options = {'pool_pre_ping': config['DATABASE_POOL_PRE_PING']}
+    if not is_memory_sqlite(url):
+        options.update(
+            pool_size=config['DATABASE_POOL_SIZE'],
+            max_overflow=config['DATABASE_MAX_OVERFLOW'],
+            pool_timeout=config['DATABASE_POOL_TIMEOUT'],
+            pool_recycle=config['DATABASE_POOL_RECYCLE'],
+        )
+    return options
+
+
+def sqlite_pragmas(config, url):
+    """根据配置生成每个 SQLite 连接需要执行的 PRAGMA 语句"""
+    journal_mode = config['SQLITE_JOURNAL_MODE'].upper()
+    synchronous = config['SQLITE_SYNCHRONOUS'].upper()
+    if journal_mode not in JOURNAL_MODES:
+        raise ValueError(f'不支持的 SQLITE_JOURNAL_MODE: {journal_mode}')
+    if synchronous not in SYNCHRONOUS_LEVELS:
+        raise ValueError(f'不支持的 SQLITE_SYNCHRONOUS: {synchronous}')
+
+    pragmas = [
+        f'PRAGMA busy_timeout={int(config["SQLITE_BUSY_TIMEOUT"])}',
+        f'PRAGMA synchronous={synchronous}',
+        f'PRAGMA cache_size={int(config["SQLITE_CACHE_SIZE"])}',
+        f'PRAGMA mmap_size={int(config["SQLITE_MMAP_SIZE"])}',
+    ]
+    # 内存数据库不支持 WAL
+    if not is_memory_sqlite(url):
+        pragmas.insert(0, f'PRAGMA journal_mode={journal_mode}')
+    return pragmas
+
+
+def register_sqlite_pragmas(engine, pragmas):
+    """在引擎的每个新 DBAPI 连接上执行 PRAGMA"""
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+def normalize_database_url(url):
+    """兼容部分托管平台提供的 postgres:// 前缀"""
+    if url and url.startswith('postgres://'):
+        return 'postgresql://' + url[len('postgres://'):]
+    return url
+
+
+class RoutingSession(Session):
+    """读写分离会话：@use_replica 视图中的只读查询走副本，flush 与写语句走主库"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and not self._flushing and isinstance(clause, Select)
+                and has_app_context() and g.get('db_use_replica')):
+            replica = self._db.engines.get(REPLICA_BIND)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def use_replica(view):
+    """将视图中的只读列表查询路由到只读副本 (未配置副本时仍使用主库)"""
+    @wraps(view)
+    def decorated_view(*args, **kwargs):
+        g.db_use_replica = True
+        return view(*args, **kwargs)
+    return decorated_view
+
+
+def init_database(app, db):
+    """配置连接池并初始化 db，为 SQLite 引擎注册连接事件"""
+    for key in DATABASE_SETTINGS:
+        app.config.setdefault(key, getattr(Config, key))
+
+    url = app.config['SQLALCHEMY_DATABASE_URI'] = normalize_database_url(app.config['SQLALCHEMY_DATABASE_URI'])
+    options = engine_options(app.config, url)
+    options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+    replica_url = normalize_database_url(app.config['DATABASE_REPLICA_URL'])
+    if replica_url:
+        binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+        binds[REPLICA_BIND] = dict(engine_options(app.config, replica_url), url=replica_url)
+        app.config['SQLALCHEMY_BINDS'] = binds
+
+    db.init_app(app)
+
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == 'sqlite':
+                register_sqlite_pragmas(engine, sqlite_pragmas(app.config, engine.url))
+    return db
+
+
+def schema_differences(db):
+    """对比模型与主库实际结构 (即迁移结果)，返回 alembic 差异列表"""
+    from alembic.autogenerate import compare_metadata
+    from alembic.migration import MigrationContext
+
+    with db.engine.connect() as connection:
+        context = MigrationContext.configure(connection, opts={'compare_type': True})
+        return compare_metadata(context, db.metadata)
+
+
+def sync_sqlite_replica(db):
+    """将 SQLite 主库整体复制到 SQLite 副本文件 (本地用两个文件模拟主从时使用)"""
+    replica = db.engines.get(REPLICA_BIND)
+    if replica is None or db.engine.dialect.name != 'sqlite' or replica.dialect.name != 'sqlite':
+        raise ValueError('主库与副本都必须是 SQLite 才能同步')
+
+    source = db.engine.raw_connection()
+    target = replica.raw_connection()
+    try:
+        source.driver_connection.backup(target.driver_connection)
+    finally:
+        target.close()
+        source.close()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+梦境/用户数据批量导入导出
+
+导出：服务端游标 + yield_per 流式读取，逐行写出 NDJSON 或 CSV，内存占用与数据量无关。
+导入：逐行读取，按批使用 executemany 批量插入，每批单独提交；
+中断后可用已提交的行数作为 offset 继续。
+"""
+
+import csv
+import json
+import time
+from datetime import date, datetime
+
+from sqlalchemy import Boolean, Date, DateTime, Float, Integer, func, select, text
+
+FORMATS = ('ndjson', 'csv')
+TRUE_VALUES = {'1', 'true', 't', 'yes', 'y'}
+
+
+def serialize_value(value):
+    """将数据库值转换为可写入 JSON/CSV 的值"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def coerce_value(column, value):
+    """按列类型转换导入的值 (CSV 中全部是字符串，NDJSON 中日期是字符串)"""
+    if value is None or (value == '' and column.nullable):
+        return None
+    if not isinstance(value, str):
+        return value
+    column_type = column.type
+    if isinstance(column_type, DateTime):
+        return datetime.fromisoformat(value)
+    if isinstance(column_type, Date):
+        return date.fromisoformat(value)
+    if isinstance(column_type, Boolean):
+        return value.strip().lower() in TRUE_VALUES
+    if isinstance(column_type, Integer):
+        return int(value)
+    if isinstance(column_type, Float):
+        return float(value)
+    return value
+
+
+class Progress:
+    """按批输出进度 (行数与速率)"""
+
+    def __init__(self, label, report, start=0):
+        self.label = label
+        self.report = report
+        self.count = start
+        self.started = time.monotonic()
+        self.start = start
+
+    def update(self, count):
+        self.count = count
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        rate = (count - self.start) / elapsed
+        self.report(f'{self.label}: {count} 行 ({rate:.0f} 行/秒)')
+
+
+def export_rows(db, table, out, fmt='ndjson', offset=0, batch_size=1000, report=None):
+    """按主键顺序流式导出表中的行，返回导出行数 (含 offset 跳过的行)"""
+    columns = [column.name for column in table.columns]
+    query = select(table).order_by(*table.primary_key.columns).offset(offset)
+
+    writer = None
+    if fmt == 'csv':
+        writer = csv.DictWriter(out, fieldnames=columns)
+        if offset == 0:
+            writer.writeheader()
+
+    progress = Progress(f'导出 {table.name}', report or (lambda message: None), offset)
+    count = offset
+    with db.engine.connect() as connection:
+        result = connection.execution_options(stream_results=True, yield_per=batch_size).execute(query)
+        for partition in result.mappings().partitions():
+            for row in partition:
+                record = {name: serialize_value(row[name]) for name in columns}
+                if writer:
+                    writer.writerow(record)
+                else:
+                    out.write(json.dumps(record, ensure_ascii=False) + '\n')
+            count += len(partition)
+            progress.update(count)
+    return count
+
+
+def read_records(infile, fmt='ndjson', offset=0):
+    """逐行读取导入文件，跳过前 offset 条记录"""
+    if fmt == 'csv':
+        reader = csv.DictReader(infile)
+    else:
+        reader = (json.loads(line) for line in infile if line.strip())
+    for index, record in enumerate(reader):
+        if index >= offset:
+            yield record
+
+
+def import_rows(db, table, infile, fmt='ndjson', offset=0, batch_size=1000, after_batch=None, report=None):
+    """
+    按批导入行，每批 executemany 插入并提交，返回已提交的记录数 (含 offset 跳过的记录)
+
+    :param after_batch: after_batch(rows) 在每批插入后、提交前调用，用于维护派生表
+    """
+    columns = {column.name: column for column in table.columns}
+    progress = Progress(f'导入 {table.name}', report or (lambda message: None), offset)
+    count = offset
+    batch = []
+
+    def flush_batch():
+        db.session.execute(table.insert(), batch)
+        if after_batch:
+            after_batch(batch)
+        db.session.commit()
+
+    try:
+        for record in read_records(infile, fmt, offset):
+            batch.append({
+                name: coerce_value(columns[name], value)
+                for name, value in record.items() if name in columns
+            })
+            if len(batch) >= batch_size:
+                flush_batch()
+                count += len(batch)
+                batch = []
+                progress.update(count)
+        if batch:
+            flush_batch()
+            count += len(batch)
+            progress.update(count)
+    except Exception as e:
+        db.session.rollback()
+        raise RuntimeError(f'导入 {table.name} 在第 {count} 条记录之后失败，可使用 --offset {count} 继续: {e}') from e
+
+    reset_sequence(db, table)
+    return count
+
+
+def reset_sequence(db, table):
+    """PostgreSQL 中显式插入主键后，将自增序列推进到当前最大值"""
+    if db.engine.dialect.name != 'postgresql':
+        return
+    primary_keys = list(table.primary_key.columns)
+    if len(primary_keys) != 1 or not isinstance(primary_keys[0].type, Integer):
+        return
+    pk = primary_keys[0]
+    max_id = db.session.execute(select(func.max(pk))).scalar()
+    if max_id:
+        db.session.execute(
+            text('SELECT setval(pg_get_serial_sequence(:table, :column), :value)'),
+            {'table': db.engine.dialect.identifier_preparer.format_table(table), 'column': pk.name, 'value': max_id}
+        )
+        db.session.commit()
@@ -0,0 +1,498 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+梦境创建、生成进度、模型库与 NFT 铸造
+"""
+
+import json
+import random
+import threading
+from datetime import datetime
+
+from flask import Blueprint, current_app, flash, jsonify, redirect, render_template, request, url_for
+from flask_login import current_user, login_required
+
+from .cache import cache_key
+from .database import use_replica
+from .extensions import cache, db
+from .logging_pipeline import log_context
+from .minting import claim_dreams, get_job, mint_errors, start_mint_job
+from .models import PUBLIC_DREAMS_TAG, Dream, Tag, parse_tags
+from .progress import dream_progress, update_dream_progress
+
+bp = Blueprint('dreams', __name__)
+
+# 路由：创建梦境页面
+@bp.route('/create_dream', methods=['GET', 'POST'])
+@login_required
+def create_dream():
+    """创造梦境页面"""
+    if request.method == 'POST':
+        try:
+            # 获取表单数据
+            dream_title = request.form.get('dream_title', '').strip()
+            dream_description = request.form.get('dream_description', '').strip()
+            dream_mood = request.form.get('dream_mood', '')
+            dream_style = request.form.get('dream_style', '')
+            blockchain = request.form.get('blockchain', '')
+            initial_price = request.form.get('initial_price', type=float)
+            royalty = request.form.get('royalty', type=float)
+            is_public = 'is_public' in request.form
+            
+            # 验证必填字段
+            if not dream_title or not dream_description or not blockchain:
+                flash('请填写所有必填字段', 'error')
+                return render_template('create_dream_modern.html')
+            
+            if len(dream_description) < 50:
+                flash('梦境描述至少需要50个字符', 'error')
+                return render_template('create_dream_modern.html')
+            
+            # 创建新的梦境模型，与 API 相同在后台生成3D模型
+            new_model = Dream(
+                title=dream_title,
+                description=dream_description,
+                dream_text=dream_description,
+                mood=dream_mood,
+                style=dream_style,
+                blockchain=blockchain,
+                price=initial_price or 0.1,
+                royalty=royalty or 2.5,
+                is_public=is_public,
+                user_id=current_user.id,
+                status='pending'
+            )
+            
+            db.session.add(new_model)
+            db.session.commit()
+            start_dream_processing(new_model.id, dream_description, current_user.id)
+            
+            flash('梦境创造成功！', 'success')
+            return redirect(url_for('dreams.model_detail', model_id=new_model.id))
+            
+        except Exception as e:
+            current_app.logger.error(f"创造梦境错误: {str(e)}")
+            flash('创造梦境时发生错误，请重试', 'error')
+            return render_template('create_dream_modern.html')
+    
+    return render_template('create_dream_modern.html')
+
+@bp.route('/api/progress/<dream_id>', methods=['GET'])
+@use_replica
+def get_progress(dream_id):
+    """
+    获取模型生成进度
+    """
+    # 检查梦境ID是否存在
+    try:
+        dream_id = int(dream_id)
+    except ValueError:
+        return jsonify({"success": False, "error": "无效的梦境ID"}), 400
+    
+    # 查找数据库中的梦境记录
+    dream = db.session.get(Dream, dream_id)
+    if not dream:
+        return jsonify({"success": False, "error": "梦境不存在"}), 404
+    
+    # 检查进度记录是否存在
+    if dream_id not in dream_progress:
+        # 如果记录不存在但梦境状态为完成
+        if dream.status == 'complete':
+            return jsonify({
+                "success": True,
+                "stage": "完成",
+                "progress": 100,
+                "remaining_minutes": 0,
+                "status": "您的梦境模型已生成完成！"
+            })
+        # 如果记录不存在且梦境状态为失败
+        elif dream.status == 'failed':
+            return jsonify({
+                "success": False,
+                "stage": "失败",
+                "progress": 0,
+                "status": "模型生成失败，请重试。"
+            }), 500
+        # 如果记录不存在但梦境还在处理中
+        elif dream.status == 'processing':
+            # 创建一个初始进度记录
+            update_dream_progress(dream_id, "分析梦境", 10, 15, "正在分析您的梦境描述...")
+        # 如果记录不存在且梦境状态为等待
+        else:  # pending
+            update_dream_progress(dream_id, "等待处理", 0, 20, "您的请求已加入队列，即将开始处理...")
+    
+    # 返回进度信息
+    progress_data = dream_progress.get(dream_id, {
+        "stage": "未知",
+        "progress": 0,
+        "remaining_minutes": 0,
+        "status": "无法获取进度信息"
+    })
+    
+    return jsonify({
+        "success": True,
+        **progress_data
+    })
+
+def start_dream_processing(dream_id, description, user_id):
+    """初始化进度并启动后台处理"""
+    update_dream_progress(dream_id, "等待处理", 0, 20, "您的请求已加入队列，即将开始处理...")
+    # 异步处理（实际应用中应使用Celery或其他任务队列）
+    # 这里为了简化，我们使用一个简单的线程
+    threading.Thread(
+        target=process_dream_async,
+        args=(current_app._get_current_object(), description, user_id, dream_id)
+    ).start()
+
+def process_dream_async(app, description, user_id, dream_id):
+    """在后台线程中处理梦境 (需要自行推入应用上下文)"""
+    with app.app_context(), log_context(dream_id=dream_id):
+        process_dream(description, user_id, dream_id)
+
+def save_partial_analysis(dream, fields):
+    """写入已收到的分析字段 (列表字段与最终结果一样存为 JSON)；写入失败只记录警告"""
+    try:
+        for field, value in fields.items():
+            setattr(dream, field, json.dumps(value) if isinstance(value, list) else value)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.warning(f'梦境 {dream.id} 分析结果写入失败: {str(e)}')
+
+def process_dream(description, user_id, dream_id):
+    """调用转换器生成模型并更新梦境记录；转换器及其依赖在此时才导入"""
+    from .converter import DreamToModelConverter
+
+    try:
+        # 更新状态为处理中
+        dream = Dream.query.get(dream_id)
+        dream.status = 'processing'
+        db.session.commit()
+        
+        # 创建转换器实例并处理梦境；流式分析的结果边收到边写入梦境记录
+        converter = DreamToModelConverter()
+        result = converter.process_dream(
+            dream_text=description, user_id=user_id, dream_id=dream_id,
+            on_analysis=lambda fields: save_partial_analysis(dream, fields)
+        )
+        
+        # 更新梦境记录
+        if result and 'model_path' in result:
+            dream.model_file = result['model_path']
+            dream.keywords = result.get('keywords', '')
+            dream.symbols = result.get('symbols', '')
+            dream.emotions = result.get('emotions', '')
+            dream.visual_description = result.get('visual_description', '')
+            dream.interpretation = result.get('interpretation', '')
+            dream.status = 'complete'
+            db.session.commit()
+            
+            # 更新最终进度
+            update_dream_progress(dream_id, "完成", 100, 0, "您的梦境模型已生成完成！")
+            current_app.logger.info(f"梦境 {dream_id} 处理完成")
+        else:
+            raise Exception("模型生成失败")
+            
+    except Exception as e:
+        current_app.logger.error(f"异步处理梦境 {dream_id} 失败: {str(e)}")
+        db.session.rollback()
+        # 更新状态为失败
+        dream = Dream.query.get(dream_id)
+        dream.status = 'failed'
+        db.session.commit()
+        
+        # 更新进度为失败状态
+        update_dream_progress(dream_id, "失败", 0, 0, f"模型生成失败: {str(e)}")
+
+# 路由：创建梦境 API
+@bp.route('/api/dreams/create', methods=['POST'])
+@login_required
+def create_dream_api():
+    """创建新的梦境记录 API"""
+    try:
+        # 从表单获取数据
+        title = request.form.get('title', 'Untitled Dream')
+        description = request.form.get('description')
+        tags = request.form.get('tags')
+        blockchain = request.form.get('blockchain')
+        price_str = request.form.get('price')
+        trading_type = request.form.get('tradingType')
+        royalty_str = request.form.get('royalty')
+
+        if not description:
+            return jsonify({'success': False, 'error': '梦境描述不能为空'}), 400
+        
+        # 字段长度校验 (PostgreSQL 会拒绝超长的 VARCHAR，SQLite 不检查)
+        for field, value, max_length in (('标题', title, 150), ('区块链', blockchain, 50), ('交易类型', trading_type, 50)):
+            if value and len(value) > max_length:
+                return jsonify({'success': False, 'error': f'{field}不能超过{max_length}个字符'}), 400
+        
+        # 数据类型转换和验证
+        price = None
+        if price_str:
+            try:
+                price = float(price_str)
+            except ValueError:
+                return jsonify({'success': False, 'error': '价格必须是数字'}), 400
+        
+        royalty = None
+        if royalty_str:
+            try:
+                royalty = float(royalty_str)
+            except ValueError:
+                return jsonify({'success': False, 'error': '版税必须是数字'}), 400
+
+        # 创建初始梦境记录
+        new_dream = Dream(
+            user_id=current_user.id,
+            title=title,
+            description=description,
+            dream_text=description,
+            blockchain=blockchain,
+            price=price,
+            trading_type=trading_type,
+            royalty=royalty,
+            status='pending'
+        )
+        new_dream.set_tags(tags)
+        db.session.add(new_dream)
+        db.session.commit()
+        
+        dream_id = new_dream.id
+        current_app.logger.info(f"创建了新梦境记录，ID: {dream_id}")
+        
+        start_dream_processing(dream_id, description, current_user.id)
+        
+        return jsonify({
+            'success': True,
+            'dream_id': dream_id,
+            'message': '梦境创建请求已提交！'
+        })
+            
+    except Exception as e:
+        current_app.logger.error(f"创建梦境API失败: {str(e)}")
+        return jsonify({'success': False, 'error': f'服务器错误: {str(e)}'}), 500
+
+def load_json_list(value):
+    """解析以JSON存储的 DeepSeek 列表字段 (兼容旧的逗号分隔数据)"""
+    if not value:
+        return []
+    try:
+        parsed = json.loads(value)
+    except ValueError:
+        return [item.strip() for item in value.split(',') if item.strip()]
+    return parsed if isinstance(parsed, list) else [parsed]
+
+# 路由：获取解释
+@bp.route('/api/interpretation/<model_name>')
+@login_required
+def get_interpretation(model_name):
+    # 从模型文件名中提取梦境ID
+    try:
+        dream_id = int(model_name.split('.')[0])
+    except ValueError:
+        return jsonify({'error': '梦境不存在'}), 404
+    
+    # 获取梦境数据
+    dream = Dream.query.filter_by(id=dream_id).first()
+    if not dream:
+        return jsonify({'error': '梦境不存在'}), 404
+    
+    # 检查权限
+    if dream.user_id != current_user.id:
+        return jsonify({'error': '没有权限访问'}), 403
+    
+    # 返回解析数据
+    return jsonify({
+        'keywords': load_json_list(dream.keywords),
+        'symbols': load_json_list(dream.symbols),
+        'emotions': load_json_list(dream.emotions),
+        'visuals': dream.visual_description,
+        'psychology': dream.interpretation
+    })
+
+@bp.route('/model_library')
+@cache.cached_response(tags=(PUBLIC_DREAMS_TAG,), query_args=('page', 'mood', 'style', 'blockchain'))
+@use_replica
+def model_library():
+    """模型库页面：已生成完成的公开梦境，支持按 情绪/风格/区块链 筛选"""
+    try:
+        page = request.args.get('page', 1, type=int)
+        
+        query = Dream.query.filter(Dream.listed())
+        for field, value in dream_filter_args().items():
+            if value:
+                query = query.filter(getattr(Dream, field) == value)
+        
+        # 作者一并加载，避免模板中逐条查询用户
+        query = query.options(db.joinedload(Dream.user)).order_by(Dream.created_at.desc())
+        models = query.paginate(page=page, per_page=12, error_out=False)
+        return render_template('model_library_modern.html', models=models)
+        
+    except Exception as e:
+        current_app.logger.error(f"模型库加载错误: {str(e)}")
+        flash('加载模型库时发生错误', 'error')
+        return render_template('model_library_modern.html', models=None)
+
+@bp.route('/model/<model_id>')
+def model_detail(model_id):
+    """
+    显示模型详情页面
+    """
+    # 在实际应用中，这里应该从数据库中获取模型信息
+    # 现在我们使用模拟的数据
+    model = {
+        'id': model_id,
+        'title': '梦境模型 #' + str(model_id),
+        'creator': '梦想家',
+        'creation_date': datetime.now().strftime('%Y-%m-%d %H:%M'),
+        'price': 0.05,
+        'currency': 'ETH',
+        'tags': ['奇幻', '抽象', '色彩'],
+        'description': '这个模型代表了一个梦境场景，由AI根据梦境描述自动生成。',
+        'model_path': f'static/models/dream_model_{model_id}.glb',
+        'technical_info': {
+            'polygons': random.randint(10000, 50000),
+            'vertices': random.randint(5000, 25000),
+            'format': 'glTF/GLB'
+        }
+    }
+    
+    return render_template('model_detail.html', model=model)
+
+@bp.route('/api/mint_nft/<int:model_id>', methods=['POST'])
+@login_required
+def mint_nft_api(model_id):
+    """NFT 铸造 API：登记铸造任务后立即返回 202，结果通过 /api/mint_jobs/<job_id> 查询"""
+    dream = db.session.get(Dream, model_id)
+    if not dream:
+        return jsonify({'success': False, 'error': '模型不存在'}), 404
+    if dream.user_id != current_user.id:
+        return jsonify({'success': False, 'error': '无权操作'}), 403
+    if dream.nft_tx_hash:
+        return jsonify({'success': False, 'error': '该模型已被铸造'}), 400
+    if dream.status not in ('complete', 'minting'):
+        return jsonify({'success': False, 'error': '模型尚未生成完成'}), 400
+    # 认领失败说明已有铸造任务在进行 (超时的认领可以重新认领)
+    claimed_at = claim_dreams([dream.id], current_user.id)
+    if not claimed_at:
+        return jsonify({'success': False, 'error': '该模型正在铸造中'}), 409
+
+    job = start_mint_job([dream.id], claimed_at)
+    current_app.logger.info(f"已登记模型 ID {model_id} 的 NFT 铸造任务 {job['job_id']}")
+    return jsonify({
+        'success': True,
+        'job_id': job['job_id'],
+        'status': job['status'],
+        'status_url': url_for('dreams.mint_job_status', job_id=job['job_id'])
+    }), 202
+
+@bp.route('/api/mint_nft/batch', methods=['POST'])
+@login_required
+def mint_nft_batch_api():
+    """批量铸造 API：请求体 {"dream_ids": [...]}，全部梦境在一笔交易中铸造，返回 202 与任务ID"""
+    data = request.get_json(silent=True) or {}
+    raw_ids = data.get('dream_ids')
+    if not isinstance(raw_ids, list) or not raw_ids:
+        return jsonify({'success': False, 'error': '请提供要铸造的梦境ID列表'}), 400
+    try:
+        dream_ids = sorted({int(dream_id) for dream_id in raw_ids})
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'error': '无效的梦境ID'}), 400
+    max_size = current_app.config['CHAIN_MAX_BATCH_SIZE']
+    if len(dream_ids) > max_size:
+        return jsonify({'success': False, 'error': f'每次最多铸造 {max_size} 个模型'}), 400
+
+    errors = mint_errors(dream_ids, current_user.id)
+    if errors:
+        return jsonify({'success': False, 'error': '部分模型无法铸造', 'errors': errors}), 400
+    claimed_at = claim_dreams(dream_ids, current_user.id)
+    if not claimed_at:
+        return jsonify({'success': False, 'error': '部分模型正在铸造中'}), 409
+
+    job = start_mint_job(dream_ids, claimed_at)
+    current_app.logger.info(f"已登记 {len(dream_ids)} 个模型的批量铸造任务 {job['job_id']}")
+    return jsonify({
+        'success': True,
+        'job_id': job['job_id'],
+        'dream_ids': dream_ids,
+        'status': job['status'],
+        'status_url': url_for('dreams.mint_job_status', job_id=job['job_id'])
+    }), 202
+
+@bp.route('/api/mint_jobs/<job_id>')
+@login_required
+def mint_job_status(job_id):
+    """查询铸造任务状态 (pending / submitted / minted / failed)，成功时返回 nft_tx_hash；仅限梦境所有者"""
+    job = get_job(job_id)
+    # 任务中的梦境不全属于当前用户时同样返回 404，不暴露其他用户的任务是否存在
+    if job is None or db.session.query(Dream.id).filter(
+        Dream.id.in_(job['dream_ids']), Dream.user_id == current_user.id
+    ).count() != len(job['dream_ids']):
+        return jsonify({'success': False, 'error': '铸造任务不存在'}), 404
+    return jsonify(dict(job, success=True))
+
+def dream_filter_args():
+    """从查询参数中读取模型库筛选条件"""
+    return {
+        'mood': request.args.get('mood', '').strip(),
+        'style': request.args.get('style', '').strip(),
+        'blockchain': request.args.get('blockchain', '').strip()
+    }
+
+@bp.route('/api/dreams')
+@use_replica
+def api_dreams():
+    """API: 按 标签/情绪/风格/区块链 浏览公开梦境 (结果缓存，梦境写入后失效)"""
+    page = request.args.get('page', 1, type=int)
+    per_page = min(request.args.get('per_page', 12, type=int), 100)
+    filters = dream_filter_args()
+    tag_names = parse_tags(request.args.get('tag', ''))
+
+    key = cache_key('api:dreams', page=page, per_page=per_page, tag=','.join(sorted(tag_names)), **filters)
+    payload = cache.remember(key, lambda: public_dreams_payload(page, per_page, filters, tag_names),
+                             tags=(PUBLIC_DREAMS_TAG,))
+    return jsonify(payload)
+
+@bp.route('/api/models')
+@use_replica
+def api_models():
+    """API: 获取模型列表 (沿用 app_modern 的 models/pagination 格式，数据与 /api/dreams 相同)"""
+    page = request.args.get('page', 1, type=int)
+    per_page = min(request.args.get('per_page', 10, type=int), 100)
+    filters = dict.fromkeys(('mood', 'style', 'blockchain'), '')
+
+    key = cache_key('api:dreams', page=page, per_page=per_page, tag='', **filters)
+    payload = cache.remember(key, lambda: public_dreams_payload(page, per_page, filters, []),
+                             tags=(PUBLIC_DREAMS_TAG,))
+    pagination = payload['pagination']
+    return jsonify({
+        'models': payload['dreams'],
+        'pagination': {
+            **pagination,
+            'has_next': pagination['page'] < pagination['pages'],
+            'has_prev': pagination['page'] > 1
+        }
+    })
+
+def public_dreams_payload(page, per_page, filters, tag_names):
+    """查询一页公开梦境 (与模型库相同，只含已生成完成的梦境)，返回可缓存的字典"""
+    query = Dream.query.filter(Dream.listed())
+    for field, value in filters.items():
+        if value:
+            query = query.filter(getattr(Dream, field) == value)
+    for name in tag_names:
+        # 通过 tag.name 唯一索引与 (tag_id, dream_id) 索引匹配，不扫描 tags 文本
+        query = query.filter(Dream.tag_items.any(Tag.name == name))
+
+    dreams = query.order_by(Dream.created_at.desc()).paginate(page=page, per_page=per_page, error_out=False)
+    return {
+        'success': True,
+        'dreams': [dream.to_dict() for dream in dreams.items],
+        'pagination': {
+            'page': dreams.page,
+            'pages': dreams.pages,
+            'per_page': dreams.per_page,
+            'total': dreams.total
+        }
+    }
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Flask 扩展实例
+
+db / login_manager / cache / password_hasher / query_inspector 在 create_app 中绑定到应用；Flask-Migrate 只在命令行中加载 (见 create_app)；
+邮件、Bootstrap 等可选扩展用 LazyExtension 包装，首次使用时才导入并初始化。
+"""
+
+import importlib
+import threading
+
+from flask import current_app
+from flask_login import LoginManager
+from flask_sqlalchemy import SQLAlchemy
+
+from .cache import Cache
+from .database import RoutingSession
+from .passwords import PasswordHasher
+from .query_inspector import QueryInspector
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+login_manager = LoginManager()
+cache = Cache()
+password_hasher = PasswordHasher()
+query_inspector = QueryInspector()
+
+
+class LazyExtension:
+    """首次调用 get() 时才导入模块并对当前应用执行 init_app 的可选扩展"""
+
+    def __init__(self, name, import_path):
+        """
+        :param name: 扩展名，实例保存在 app.extensions['lazy_<name>']
+        :param import_path: '模块:类名'，例如 'flask_mail:Mail'
+        """
+        self.name = name
+        self.import_path = import_path
+        self._lock = threading.Lock()
+
+    @property
+    def key(self):
+        return f'lazy_{self.name}'
+
+    def get(self, app=None):
+        """返回绑定到应用的扩展实例，必要时先导入并初始化"""
+        app = app or current_app._get_current_object()
+        extension = app.extensions.get(self.key)
+        if extension is not None:
+            return extension
+        with self._lock:
+            if self.key not in app.extensions:
+                module_name, _, class_name = self.import_path.partition(':')
+                extension = getattr(importlib.import_module(module_name), class_name)()
+                extension.init_app(app)
+                app.extensions[self.key] = extension
+        return app.extensions[self.key]
+
+
+mail = LazyExtension('mail', 'flask_mail:Mail')
+# Bootstrap 注册蓝图，只能在处理首个请求前初始化，由 BOOTSTRAP_ENABLED 控制是否在 create_app 中加载
+bootstrap = LazyExtension('bootstrap', 'flask_bootstrap:Bootstrap')
+
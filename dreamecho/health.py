@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+健康检查与指标 (所有配置档)
+"""
+
+from datetime import datetime
+
+from flask import Blueprint, Response, current_app, jsonify
+
+from . import metrics
+
+bp = Blueprint('health', __name__)
+
+@bp.route('/health')
+def health_check():
+    """负载均衡/容器探活"""
+    payload = {
+        'status': 'ok',
+        'profile': current_app.config['APP_PROFILE'],
+        'timestamp': datetime.utcnow().isoformat()
+    }
+    cache = current_app.extensions.get('dreamecho_cache')
+    if cache is not None:
+        payload['response_cache'] = cache.response_hit_ratio()
+    return jsonify(payload)
+
+@bp.route('/metrics')
+def metrics_endpoint():
+    """Prometheus 抓取 (本进程的内存指标，不访问数据库)"""
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+fast / static 配置档的首页
+
+页面不含动态内容，首次请求时读取模板并缓存字节与 ETag，之后直接返回，支持 304。
+"""
+
+import hashlib
+import os
+
+from flask import Blueprint, current_app, make_response, request
+
+bp = Blueprint('landing', __name__)
+
+def landing_page():
+    """返回缓存的首页 (字节, ETag)"""
+    page = current_app.extensions.get('landing_page')
+    if page is None:
+        path = os.path.join(current_app.template_folder, current_app.config['LANDING_TEMPLATE'])
+        with open(path, 'rb') as f:
+            body = f.read()
+        page = current_app.extensions['landing_page'] = (body, hashlib.sha1(body).hexdigest())
+    return page
+
+@bp.route('/')
+def index():
+    """首页"""
+    body, etag = landing_page()
+    if request.if_none_match.contains(etag):
+        response = make_response('', 304)
+    else:
+        response = make_response(body)
+        response.content_type = 'text/html; charset=utf-8'
+    response.set_etag(etag)
+    return response
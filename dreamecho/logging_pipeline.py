@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+异步结构化日志
+
+请求线程与后台线程只把日志记录放入有界队列 (QueueHandler)，由监听线程格式化为 JSON 行
+并写入按大小滚动的文件 (同时以文本格式输出到标准错误)，文件 I/O 与滚动不发生在请求线程中。
+队列满 (磁盘过慢) 时丢弃新记录并计数，恢复后写入一条丢弃数量的警告，记录日志不会阻塞请求。
+
+每行包含 request_id (请求头 X-Request-ID，没有则生成，并写回响应头)，
+以及通过 log_context(dream_id=..., stage=...) 绑定的梦境ID与处理阶段。
+"""
+
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import threading
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from flask import g, has_request_context, request
+from flask.logging import default_handler
+
+from . import metrics
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+CONTEXT_FIELDS = ('request_id', 'dream_id', 'stage')
+
+DROPPED_RECORDS = metrics.counter('dreamecho_log_records_dropped', '日志队列已满时丢弃的记录数')
+
+_log_context = ContextVar('log_context', default={})
+
+
+@contextmanager
+def log_context(**values):
+    """在当前线程 (上下文) 中为日志记录附加字段，例如 dream_id、stage"""
+    token = _log_context.set({**_log_context.get(), **values})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """在产生日志的线程中取出请求ID与上下文字段 (监听线程中已无法获取)"""
+
+    def filter(self, record):
+        context = _log_context.get()
+        for field in CONTEXT_FIELDS:
+            if not hasattr(record, field):
+                setattr(record, field, context.get(field))
+        if record.request_id is None and has_request_context():
+            record.request_id = g.get('request_id')
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """每条记录一行 JSON"""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'location': f'{record.pathname}:{record.lineno}',
+            'thread': record.threadName,
+        }
+        for field in CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """队列满时丢弃记录而不是等待；丢弃数量计入指标，队列恢复后补写一条警告"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def prepare(self, record):
+        # 在产生日志的线程中合并消息与参数、格式化异常，监听线程只负责输出
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+            DROPPED_RECORDS.inc()
+            return
+        if self.dropped:
+            with self._dropped_lock:
+                dropped, self.dropped = self.dropped, 0
+            if dropped:
+                notice = logging.LogRecord(record.name, logging.WARNING, __file__, 0,
+                                           f'日志队列已满，丢弃了 {dropped} 条日志', None, None)
+                try:
+                    self.queue.put_nowait(notice)
+                except queue.Full:
+                    with self._dropped_lock:
+                        self.dropped += dropped
+
+
+class LogPipeline:
+    """队列 + 监听线程；fork 后的子进程在首次记录日志时重新启动监听线程"""
+
+    def __init__(self, handlers, queue_size):
+        self.handlers = handlers
+        self.queue_size = queue_size
+        self.handler = None
+        self.listener = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        log_queue = queue.Queue(maxsize=self.queue_size)
+        if self.handler is None:
+            self.handler = PipelineHandler(self, log_queue)
+            self.handler.addFilter(ContextFilter())
+        else:
+            self.handler.queue = log_queue
+        self.listener = QueueListener(log_queue, *self.handlers, respect_handler_level=True)
+        self.listener.start()
+        self._pid = os.getpid()
+        return self.handler
+
+    def ensure_running(self):
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self.start()
+
+    def stop(self):
+        if self.listener is not None and self._pid == os.getpid():
+            self.listener.stop()  # 写完队列中剩余的记录
+            self.listener = None
+        for handler in self.handlers:
+            handler.close()
+
+
+class PipelineHandler(DroppingQueueHandler):
+    def __init__(self, pipeline, log_queue):
+        super().__init__(log_queue)
+        self.pipeline = pipeline
+
+    def emit(self, record):
+        self.pipeline.ensure_running()
+        super().emit(record)
+
+
+def init_request_id(app):
+    """为每个请求分配请求ID (沿用上游的 X-Request-ID)，并写回响应头"""
+    @app.before_request
+    def assign_request_id():
+        g.request_id = request.headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex
+
+    @app.after_request
+    def add_request_id_header(response):
+        request_id = g.get('request_id')
+        if request_id:
+            response.headers.setdefault(REQUEST_ID_HEADER, request_id)
+        return response
+
+
+def configure_logging(app, log_dir):
+    """应用日志 (logger 'dreamecho'，包括各模块的子 logger) 经队列异步写入 JSON 行文件"""
+    init_request_id(app)
+    if app.testing:
+        return None
+    config = app.config
+    os.makedirs(log_dir, exist_ok=True)
+    file_handler = RotatingFileHandler(
+        os.path.join(log_dir, 'dream_to_model.log'), maxBytes=config['LOG_MAX_BYTES'],
+        backupCount=config['LOG_BACKUP_COUNT'], encoding='utf-8', delay=True
+    )
+    file_handler.setFormatter(JsonFormatter())
+    level = logging.getLevelName(config['LOG_LEVEL'])
+    file_handler.setLevel(level)
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(default_handler.formatter)
+
+    # 'dreamecho' logger 在进程内共享：再次创建应用时替换之前的管道，避免每条记录重复写出
+    for handler in list(app.logger.handlers):
+        if isinstance(handler, PipelineHandler):
+            app.logger.removeHandler(handler)
+            atexit.unregister(handler.pipeline.stop)
+            handler.pipeline.stop()
+
+    pipeline = LogPipeline([file_handler, console_handler], config['LOG_QUEUE_SIZE'])
+    app.logger.removeHandler(default_handler)  # 控制台输出也由监听线程完成
+    app.logger.addHandler(pipeline.start())
+    app.logger.setLevel(level)
+    app.extensions['log_pipeline'] = pipeline
+    atexit.register(pipeline.stop)
+    app.logger.info('梦境转3D模型应用启动')
+    return pipeline
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+页面路由：首页、个人中心、静态信息页与错误页
+"""
+
+from flask import Blueprint, current_app, render_template, request
+from flask_login import current_user, login_required
+
+from .database import use_replica
+from .extensions import cache, db
+from .models import PUBLIC_DREAMS_TAG, Dream
+
+bp = Blueprint('main', __name__)
+
+# 路由：首页
+@bp.route('/')
+@cache.cached_response(tags=(PUBLIC_DREAMS_TAG,), query_args=())
+@use_replica
+def index():
+    """首页"""
+    try:
+        # 最新的一些模型用于展示 (与模型库条件相同)；不在此处执行查询，模板片段缓存命中时不访问数据库
+        recent_models = Dream.query.filter(Dream.listed()).order_by(Dream.created_at.desc()).limit(6)
+        return render_template('index_modern.html', recent_models=recent_models)
+    except Exception as e:
+        current_app.logger.error(f"首页加载错误: {str(e)}")
+        return render_template('index_modern.html', recent_models=[])
+
+# 路由：个人中心
+@bp.route('/profile')
+@login_required
+def profile():
+    """个人中心页面"""
+    return render_template('profile.html')
+
+# 路由：设置页面
+@bp.route('/settings')
+@login_required
+def settings():
+    """设置页面"""
+    return render_template('settings.html')
+
+# 路由：联系我们
+@bp.route('/contact')
+def contact():
+    return render_template('contact.html')
+
+# 路由：常见问题
+@bp.route('/faq')
+def faq():
+    return render_template('faq.html')
+
+# 路由：隐私政策
+@bp.route('/privacy')
+def privacy():
+    return render_template('privacy.html')
+
+@bp.route('/project_background')
+def project_background():
+    """项目背景页面"""
+    return render_template('project_background.html')
+
+@bp.route('/style-guide')
+def style_guide():
+    """渲染设计系统样式指南页面"""
+    return render_template('style_guide.html')
+
+@bp.route('/about')
+def about():
+    """渲染项目背景页面"""
+    return render_template('about.html')
+
+@bp.route('/my_dreams')
+@login_required
+def my_dreams():
+    dreams = Dream.query.filter_by(user_id=current_user.id).all()
+    return render_template('my_dreams.html', dreams=dreams)
+
+# 错误处理
+@bp.app_errorhandler(404)
+def page_not_found(e):
+    return render_template('404.html'), 404
+
+@bp.app_errorhandler(500)
+def internal_error(error):
+    db.session.rollback()
+    current_app.logger.error(f'服务器错误: {error}')
+    return render_template('500.html'), 500
+
+@bp.app_errorhandler(413)
+def too_large(error):
+    current_app.logger.error(f'文件过大: {request.url}')
+    return render_template('413.html'), 413
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+所有配置档共用的响应中间件：缓存头、安全头、gzip 压缩
+"""
+
+from flask import current_app, request
+
+SECURITY_HEADERS = {
+    'X-Content-Type-Options': 'nosniff',
+    'X-Frame-Options': 'DENY',
+    'X-XSS-Protection': '1; mode=block',
+}
+
+
+def init_app(app):
+    """注册响应头中间件，并按配置启用压缩"""
+    app.after_request(set_response_headers)
+    if app.config['COMPRESS_ENABLED']:
+        init_compress(app)
+
+
+def set_response_headers(response):
+    """静态文件长期缓存；HTML 按配置档决定是否允许缓存；附加安全头"""
+    if request.endpoint == 'static':
+        response.cache_control.no_cache = None  # 覆盖 send_file 默认的 no-cache
+        response.cache_control.public = True
+        response.cache_control.max_age = current_app.config['STATIC_CACHE_MAX_AGE']
+    elif response.mimetype == 'text/html' and 'Cache-Control' not in response.headers:
+        max_age = current_app.config['HTML_CACHE_MAX_AGE']
+        if max_age:
+            response.cache_control.public = True
+            response.cache_control.max_age = max_age
+        else:
+            response.cache_control.private = True
+            response.cache_control.no_cache = True
+    for header, value in SECURITY_HEADERS.items():
+        response.headers.setdefault(header, value)
+    return response
+
+
+def init_compress(app):
+    """启用 Flask-Compress (可选依赖，未安装时跳过)"""
+    try:
+        from flask_compress import Compress
+    except ImportError:
+        app.logger.warning('未安装 Flask-Compress，响应不压缩')
+        return
+    Compress(app)
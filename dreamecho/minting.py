@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+NFT 铸造任务
+
+接口只认领梦境并登记任务 (返回 202 与任务ID)，交易在有界线程池中提交并等待确认：
+同时进行的交易数由 CHAIN_MAX_CONCURRENT_TX 限制，与 Web 线程数无关。
+任务状态 (pending / submitted / minted / failed) 保存在共享缓存中，任意 worker 都可查询。
+
+认领时记录时间 (updated_at)：进程在任务中途退出时梦境会停留在 minting，
+超过 MINT_CLAIM_TIMEOUT 的认领视为中断，可以重新认领，也可用 flask release-stale-mints 释放。
+"""
+
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import update
+
+from .chain import MintError, get_chain
+from .extensions import cache, db
+from .models import PUBLIC_DREAMS_TAG, Dream
+
+# 本进程登记的任务 (共享缓存不可用时的后备)：任务ID -> (过期时间, 任务)，按登记顺序淘汰
+MAX_LOCAL_JOBS = 1000
+mint_jobs = OrderedDict()
+_jobs_lock = threading.Lock()
+
+_executor = None
+_executor_pid = None
+_lock = threading.Lock()
+
+
+def job_key(job_id):
+    return f'mint_job:{job_id}'
+
+
+def save_job(job):
+    timeout = current_app.config['MINT_JOB_TIMEOUT']
+    with _jobs_lock:
+        mint_jobs[job['job_id']] = (time.monotonic() + timeout, job)
+        mint_jobs.move_to_end(job['job_id'])
+        while len(mint_jobs) > MAX_LOCAL_JOBS:
+            mint_jobs.popitem(last=False)
+    cache.set(job_key(job['job_id']), job, timeout)
+
+
+def get_job(job_id):
+    job = cache.get(job_key(job_id))
+    if job is not None:
+        return job
+    with _jobs_lock:
+        entry = mint_jobs.get(job_id)
+        if entry is not None and entry[0] <= time.monotonic():
+            del mint_jobs[job_id]
+            entry = None
+    return entry[1] if entry else None
+
+
+def stale_claim_before():
+    """早于该时间的 minting 认领视为中断"""
+    return datetime.utcnow() - timedelta(seconds=current_app.config['MINT_CLAIM_TIMEOUT'])
+
+
+def is_stale_claim(status, claimed_at):
+    return status == 'minting' and claimed_at is not None and claimed_at < stale_claim_before()
+
+
+def update_dreams(dream_ids, conditions=(), **values):
+    """单条 UPDATE 修改多个梦境并提交，返回受影响的行数"""
+    result = db.session.execute(
+        update(Dream).where(Dream.id.in_(dream_ids), *conditions).values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    cache.invalidate_tags(PUBLIC_DREAMS_TAG)  # 批量 UPDATE 不经过 ORM 的失效钩子
+    return result.rowcount
+
+
+def claim_dreams(dream_ids, user_id):
+    """
+    用单条 UPDATE 将用户已生成完成且未铸造的梦境 (或认领已超时的梦境) 标记为 minting
+
+    全部认领成功才提交并返回认领时间 (写入 updated_at，任务据此确认认领仍属于自己)；
+    任一梦境已被其他请求认领时回滚并返回 None
+    """
+    claimed_at = datetime.utcnow()
+    result = db.session.execute(
+        update(Dream).where(
+            Dream.id.in_(dream_ids), Dream.user_id == user_id, Dream.nft_tx_hash.is_(None),
+            db.or_(
+                Dream.status == 'complete',
+                db.and_(Dream.status == 'minting', Dream.updated_at < stale_claim_before())
+            )
+        ).values(status='minting', updated_at=claimed_at).execution_options(synchronize_session=False)
+    )
+    if result.rowcount != len(dream_ids):
+        db.session.rollback()
+        return None
+    db.session.commit()
+    cache.invalidate_tags(PUBLIC_DREAMS_TAG)
+    return claimed_at
+
+
+def release_stale_claims():
+    """将认领超时的梦境恢复为 complete，返回释放的数量"""
+    result = db.session.execute(
+        update(Dream).where(
+            Dream.status == 'minting', Dream.nft_tx_hash.is_(None), Dream.updated_at < stale_claim_before()
+        ).values(status='complete').execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    cache.invalidate_tags(PUBLIC_DREAMS_TAG)
+    return result.rowcount
+
+
+def mint_errors(dream_ids, user_id):
+    """一次查询校验多个梦境能否由该用户铸造，返回 {梦境ID: 错误信息}"""
+    rows = db.session.query(Dream.id, Dream.user_id, Dream.status, Dream.nft_tx_hash, Dream.updated_at).filter(
+        Dream.id.in_(dream_ids)
+    ).all()
+    found = {row.id: row for row in rows}
+    errors = {}
+    for dream_id in dream_ids:
+        row = found.get(dream_id)
+        if row is None:
+            errors[dream_id] = '模型不存在'
+        elif row.user_id != user_id:
+            errors[dream_id] = '无权操作'
+        elif row.nft_tx_hash:
+            errors[dream_id] = '该模型已被铸造'
+        elif row.status == 'minting' and not is_stale_claim(row.status, row.updated_at):
+            errors[dream_id] = '该模型正在铸造中'
+        elif row.status not in ('complete', 'minting'):
+            errors[dream_id] = '模型尚未生成完成'
+    return errors
+
+
+def mint_executor(app):
+    """本进程的铸造线程池 (大小为 CHAIN_MAX_CONCURRENT_TX)"""
+    global _executor, _executor_pid
+    with _lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(
+                max_workers=app.config['CHAIN_MAX_CONCURRENT_TX'], thread_name_prefix='mint'
+            )
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def start_mint_job(dream_ids, claimed_at):
+    """登记铸造任务并提交到线程池，返回任务"""
+    job = {
+        'job_id': uuid.uuid4().hex,
+        'dream_ids': list(dream_ids),
+        'status': 'pending',
+        'nft_tx_hash': None,
+        'error': None,
+        'created_at': datetime.utcnow().isoformat(),
+        'claimed_at': claimed_at.isoformat()
+    }
+    save_job(job)
+    app = current_app._get_current_object()
+    mint_executor(app).submit(run_mint_job, app, job)
+    return job
+
+
+def run_mint_job(app, job):
+    """在一笔交易中铸造任务中的全部梦境，确认后用单条 UPDATE 写回交易哈希"""
+    with app.app_context():
+        try:
+            mint_job(app, job)
+        except Exception as e:
+            # 线程池中的异常不会被任何人取出，记录到任务状态
+            db.session.rollback()
+            app.logger.error(f"梦境 {job['dream_ids']} 铸造任务异常: {str(e)}")
+            save_job(dict(job, status='failed', error='服务器内部错误，请联系管理员'))
+
+
+def mint_job(app, job):
+    job = dict(job, status='submitted')
+    save_job(job)
+    tokens = [
+        {'dream_id': dream.id, 'owner': dream.user_id, 'blockchain': dream.blockchain, 'title': dream.title}
+        for dream in Dream.query.filter(Dream.id.in_(job['dream_ids'])).order_by(Dream.id)
+    ]
+    db.session.rollback()  # 等待链上确认期间不占用数据库连接
+    try:
+        tx_hash = get_chain(app).mint_batch(tokens)
+    except MintError as e:
+        app.logger.warning(f"梦境 {job['dream_ids']} NFT 铸造失败: {str(e)}")
+        fail_mint_job(job, str(e))
+        return
+    except Exception as e:
+        app.logger.error(f"梦境 {job['dream_ids']} NFT 铸造时发生意外错误: {str(e)}")
+        fail_mint_job(job, '服务器内部错误，请联系管理员')
+        return
+
+    try:
+        # 交易已确认：即使认领已超时被重新认领也写回 (以先确认的交易为准)
+        update_dreams(job['dream_ids'], (Dream.nft_tx_hash.is_(None),), status='minted', nft_tx_hash=tx_hash)
+    except Exception as e:
+        db.session.rollback()
+        app.logger.error(f"梦境 {job['dream_ids']} 交易 {tx_hash} 已确认，但写回数据库失败: {str(e)}")
+        save_job(dict(job, status='failed', nft_tx_hash=tx_hash, error='交易已确认，但保存铸造结果失败，请联系管理员'))
+        return
+    save_job(dict(job, status='minted', nft_tx_hash=tx_hash))
+    app.logger.info(f"梦境 {job['dream_ids']} NFT 铸造成功，交易哈希: {tx_hash}")
+
+
+def fail_mint_job(job, error):
+    """释放认领 (梦境恢复为 complete，可重新铸造) 并记录失败原因；认领已被其他任务接手时不释放"""
+    claimed_at = datetime.fromisoformat(job['claimed_at'])
+    update_dreams(job['dream_ids'], (Dream.status == 'minting', Dream.updated_at == claimed_at), status='complete')
+    save_job(dict(job, status='failed', error=error))
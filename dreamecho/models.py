@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据模型：用户、梦境、规范化标签与标签分面计数
+"""
+
+import importlib
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import chain
+
+from flask import current_app
+from flask_login import UserMixin
+from sqlalchemy import event, func, inspect as sa_inspect, literal_column
+
+from .extensions import cache, db, login_manager, password_hasher
+
+# 依赖公开梦境列表的缓存条目 (模型库、/api/dreams、标签分面) 使用此标签，梦境写入提交后失效
+PUBLIC_DREAMS_TAG = 'dreams:public'
+# 模型库展示的梦境状态 (模型已生成完成，包括铸造中与已铸造)
+LISTED_STATUSES = ('complete', 'minting', 'minted')
+
+# 用户模型
+class User(UserMixin, db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(80), unique=True, nullable=False)
+    email = db.Column(db.String(120), unique=True, nullable=False)
+    password_hash = db.Column(db.String(128))
+    is_active = db.Column(db.Boolean, default=False)
+    is_admin = db.Column(db.Boolean, default=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    avatar_url = db.Column(db.String(200))
+    dreams = db.relationship('Dream', backref='user', lazy=True)
+
+    def set_password(self, password):
+        self.password_hash = password_hasher.hash(password)
+
+    def check_password(self, password):
+        """校验密码；哈希参数已变化时顺便重新哈希 (由调用方提交)"""
+        if not password_hasher.verify(self.password_hash, password):
+            return False
+        if password_hasher.needs_rehash(self.password_hash):
+            self.set_password(password)
+        return True
+
+    def snapshot(self):
+        return UserSnapshot(
+            id=self.id, username=self.username, email=self.email, is_active=bool(self.is_active),
+            is_admin=bool(self.is_admin), avatar_url=self.avatar_url
+        )
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """
+    登录用户的只读快照，由 load_user 从缓存返回 (current_user)，避免每个请求加载 ORM 对象
+
+    需要修改用户或访问关联关系时调用 to_model() 取得 ORM 对象；
+    用户提交修改后缓存中的快照随即失效。
+    """
+    id: int
+    username: str
+    email: str
+    is_active: bool
+    is_admin: bool
+    avatar_url: str = None
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def get_id(self):
+        return str(self.id)
+
+    def to_model(self):
+        """加载对应的 ORM 用户对象"""
+        return db.session.get(User, self.id)
+
+# 梦境模型
+class Dream(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    
+    # Form Inputs
+    title = db.Column(db.String(150), nullable=False, default="Untitled Dream")
+    description = db.Column(db.Text, nullable=True) # Original dream text can go here
+    tags = db.Column(db.String(255), nullable=True) # Comma-separated tags
+    blockchain = db.column_property(db.Column(db.String(50), nullable=True), active_history=True)
+    price = db.Column(db.Float, nullable=True)
+    trading_type = db.Column(db.String(50), nullable=True) # e.g., 'fixed', 'auction'
+    royalty = db.Column(db.Float, nullable=True) # Royalty percentage
+    preview_image = db.Column(db.String(255), nullable=True, default='default_preview.png') # Default preview
+
+    # Generated Data
+    dream_text = db.Column(db.Text, nullable=False) # Keep original text
+    model_file = db.Column(db.String(255)) # Path to the model file (e.g., .glb, .obj)
+    # interpretation_file = db.Column(db.String(255)) # Maybe not needed if storing text?
+    keywords = db.Column(db.Text) # JSON string from DeepSeek
+    symbols = db.Column(db.Text) # JSON string from DeepSeek
+    emotions = db.Column(db.Text) # JSON string from DeepSeek
+    visual_description = db.Column(db.Text) # From DeepSeek
+    interpretation = db.Column(db.Text) # From DeepSeek
+    nft_tx_hash = db.Column(db.String(128), nullable=True) # Store minting transaction hash
+    # e.g., pending, processing, complete, minted, failed；active_history 供分面计数与缓存失效判断旧状态
+    status = db.column_property(db.Column(db.String(50), default='pending'), active_history=True)
+
+    # 分面筛选属性 (模型库按 情绪/风格/区块链 筛选)
+    # active_history: 修改时保留旧值，供标签分面计数计算增量
+    mood = db.column_property(db.Column(db.String(50), nullable=True), active_history=True)
+    style = db.column_property(db.Column(db.String(50), nullable=True), active_history=True)
+    is_public = db.column_property(db.Column(db.Boolean, default=True), active_history=True)
+
+    # 规范化标签 (tags 列仅保留为兼容旧数据的文本副本)
+    tag_items = db.relationship('Tag', secondary='dream_tag', lazy='selectin',
+                                backref=db.backref('dreams', lazy='dynamic'))
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @classmethod
+    def listed(cls):
+        """公开列表 (首页、模型库、/api/dreams、标签分面) 的统一条件：公开 (旧数据为 NULL) 且已生成完成"""
+        return db.and_(db.or_(cls.is_public.is_(None), cls.is_public.is_(True)), cls.status.in_(LISTED_STATUSES))
+
+    @property
+    def tag_names(self):
+        """标签名列表"""
+        return [tag.name for tag in self.tag_items]
+
+    def set_tags(self, raw_tags):
+        """设置标签：写入规范化标签表，并同步 tags 文本列"""
+        self.tag_items = get_or_create_tags(parse_tags(raw_tags))
+        self.tags = ','.join(self.tag_names) or None
+
+    def to_dict(self):
+        """公开列表中的梦境摘要 (/api/dreams)"""
+        return {
+            'id': self.id,
+            'title': self.title,
+            'mood': self.mood,
+            'style': self.style,
+            'blockchain': self.blockchain,
+            'tags': self.tag_names,
+            'status': self.status,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+# 梦境-标签关联表，(tag_id, dream_id) 索引用于按标签浏览
+dream_tag = db.Table(
+    'dream_tag',
+    db.Column('dream_id', db.Integer, db.ForeignKey('dream.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('tag_id', db.Integer, db.ForeignKey('tag.id', ondelete='CASCADE'), primary_key=True),
+    db.Index('ix_dream_tag_tag_id_dream_id', 'tag_id', 'dream_id')
+)
+
+# 标签模型
+class Tag(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(50), unique=True, nullable=False, index=True)
+
+# 标签分面计数：按 (标签, 情绪, 风格, 区块链) 增量维护，仅统计出现在公开列表中的梦境 (Dream.listed)
+class TagFacetCount(db.Model):
+    __tablename__ = 'tag_facet_count'
+    tag_id = db.Column(db.Integer, db.ForeignKey('tag.id', ondelete='CASCADE'), primary_key=True)
+    mood = db.Column(db.String(50), primary_key=True, default='')  # 空字符串表示未设置
+    style = db.Column(db.String(50), primary_key=True, default='')
+    blockchain = db.Column(db.String(50), primary_key=True, default='')
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index('ix_tag_facet_count_filters', 'mood', 'style', 'blockchain'),
+    )
+
+# 梦境生成各阶段耗时 (探测、分析、创建任务、等待、下载、后处理)，用于按阶段统计分位数
+class DreamStageTiming(db.Model):
+    __tablename__ = 'dream_stage_timing'
+    id = db.Column(db.Integer, primary_key=True)
+    dream_id = db.Column(db.Integer, db.ForeignKey('dream.id', ondelete='CASCADE'), nullable=False, index=True)
+    stage = db.Column(db.String(32), nullable=False)
+    outcome = db.Column(db.String(16), nullable=False)  # ok / error
+    started_at = db.Column(db.DateTime, nullable=False)
+    duration_ms = db.Column(db.Float, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_dream_stage_timing_started_at_stage', 'started_at', 'stage'),
+    )
+
+TAG_SEPARATORS = re.compile(r'[,，、;；\n]+')
+MAX_TAG_LENGTH = 50
+
+def parse_tags(raw_tags):
+    """将逗号分隔的字符串或列表规范化为去重后的标签名列表"""
+    if not raw_tags:
+        return []
+    if isinstance(raw_tags, str):
+        raw_tags = TAG_SEPARATORS.split(raw_tags)
+    names = []
+    for raw in raw_tags:
+        name = str(raw).strip().lower()[:MAX_TAG_LENGTH]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+# 支持 INSERT ... ON CONFLICT DO NOTHING 的方言 (按需导入对应的 sqlalchemy.dialects 模块)
+UPSERT_DIALECTS = ('sqlite', 'postgresql')
+
+def get_or_create_tags(names):
+    """一次查询取出已有标签，缺失的新建"""
+    if not names:
+        return []
+    existing = {tag.name: tag for tag in Tag.query.filter(Tag.name.in_(names)).all()}
+    missing = [name for name in names if name not in existing]
+    dialect_name = db.session.get_bind().dialect.name
+    if missing and dialect_name in UPSERT_DIALECTS:
+        dialect = importlib.import_module(f'sqlalchemy.dialects.{dialect_name}')
+        # 并发请求可能同时创建同名标签，冲突时忽略后重新查询
+        db.session.execute(
+            dialect.insert(Tag).on_conflict_do_nothing(index_elements=['name']),
+            [{'name': name} for name in missing]
+        )
+        existing.update((tag.name, tag) for tag in Tag.query.filter(Tag.name.in_(missing)).all())
+    tags = []
+    for name in names:
+        tag = existing.get(name)
+        if tag is None:
+            tag = Tag(name=name)
+            db.session.add(tag)
+        tags.append(tag)
+    return tags
+
+# --- 标签分面计数的增量维护 ---
+# before_flush 中对比梦境的新旧状态计算增量 (此时新标签尚无ID)，after_flush 中写入计数表
+FACET_ATTRS = ('mood', 'style', 'blockchain', 'is_public', 'status')
+
+def is_listed(is_public, status):
+    """与 Dream.listed() 相同的判断 (is_public 为 None 视为公开，status 默认值在 INSERT 时才写入)"""
+    return is_public is not False and (status or 'pending') in LISTED_STATUSES
+
+def _facet_entries(dream, previous=False):
+    """返回梦境贡献的分面计数键列表；previous=True 时使用 flush 前的旧值"""
+    state = sa_inspect(dream)
+    values = {}
+    for attr in FACET_ATTRS:
+        value = getattr(dream, attr)
+        if previous:
+            history = state.attrs[attr].history
+            if history.deleted:
+                value = history.deleted[0]
+        values[attr] = value
+
+    if not is_listed(values['is_public'], values['status']):
+        return []
+
+    tags = list(dream.tag_items)
+    if previous:
+        history = state.attrs.tag_items.history
+        if history.has_changes():
+            tags = list(history.unchanged) + list(history.deleted)
+
+    facet = (values['mood'] or '', values['style'] or '', values['blockchain'] or '')
+    return [(tag,) + facet for tag in tags]
+
+@event.listens_for(db.session, 'before_flush')
+def _collect_tag_facet_deltas(session, flush_context, instances):
+    deltas = {}
+    for dream in session.new:
+        if isinstance(dream, Dream):
+            for key in _facet_entries(dream):
+                deltas[key] = deltas.get(key, 0) + 1
+    for dream in session.deleted:
+        if isinstance(dream, Dream) and sa_inspect(dream).persistent:
+            for key in _facet_entries(dream, previous=True):
+                deltas[key] = deltas.get(key, 0) - 1
+    for dream in session.dirty:
+        if not isinstance(dream, Dream) or dream in session.deleted:
+            continue
+        state = sa_inspect(dream)
+        if not any(state.attrs[attr].history.has_changes() for attr in FACET_ATTRS + ('tag_items',)):
+            continue
+        for key in _facet_entries(dream, previous=True):
+            deltas[key] = deltas.get(key, 0) - 1
+        for key in _facet_entries(dream):
+            deltas[key] = deltas.get(key, 0) + 1
+    session.info['tag_facet_deltas'] = {key: delta for key, delta in deltas.items() if delta}
+
+@event.listens_for(db.session, 'after_flush')
+def _apply_tag_facet_deltas(session, flush_context):
+    deltas = session.info.pop('tag_facet_deltas', None)
+    if not deltas:
+        return
+    table = TagFacetCount.__table__
+    connection = session.connection()
+    dialect_name = connection.dialect.name
+    upsert = None
+    if dialect_name in UPSERT_DIALECTS:
+        # 并发事务可能同时写入同一分面组合的第一行，以 ON CONFLICT 累加而不是先 UPDATE 再 INSERT
+        insert = importlib.import_module(f'sqlalchemy.dialects.{dialect_name}').insert(table)
+        upsert = insert.on_conflict_do_update(
+            index_elements=[table.c.tag_id, table.c.mood, table.c.style, table.c.blockchain],
+            set_={'count': table.c.count + insert.excluded.count}
+        )
+    for (tag, mood, style, blockchain), delta in deltas.items():
+        if delta > 0 and upsert is not None:
+            connection.execute(upsert, {
+                'tag_id': tag.id, 'mood': mood, 'style': style, 'blockchain': blockchain, 'count': delta
+            })
+            continue
+        match = (
+            (table.c.tag_id == tag.id) & (table.c.mood == mood) &
+            (table.c.style == style) & (table.c.blockchain == blockchain)
+        )
+        result = connection.execute(table.update().where(match).values(count=table.c.count + delta))
+        if result.rowcount == 0 and delta > 0:
+            connection.execute(table.insert().values(
+                tag_id=tag.id, mood=mood, style=style, blockchain=blockchain, count=delta
+            ))
+
+# --- 共享缓存失效 ---
+# flush 时记录需要失效的标签，提交成功后才删除缓存 (回滚则丢弃)，避免其他 worker 读到未提交数据后重新缓存
+# 公开列表 (首页、模型库、/api/dreams、标签分面) 展示或筛选用到的列；分析结果等其他列的更新不失效列表缓存
+LISTING_ATTRS = (
+    'title', 'description', 'dream_text', 'price', 'created_at', 'user_id', 'tag_items'
+) + FACET_ATTRS
+
+def _affects_public_listing(session, dream):
+    """梦境在 flush 前或后出现在公开列表中，且 (修改时) 列表相关的列有变化"""
+    state = sa_inspect(dream)
+    if dream in session.new:
+        return is_listed(dream.is_public, dream.status)
+    if dream in session.deleted:
+        changed = True
+    else:
+        changed = any(state.attrs[attr].history.has_changes() for attr in LISTING_ATTRS)
+        if not changed:
+            return False
+        if is_listed(dream.is_public, dream.status):
+            return True
+    previous = {}
+    for attr in ('is_public', 'status'):
+        history = state.attrs[attr].history
+        previous[attr] = history.deleted[0] if history.deleted else getattr(dream, attr)
+    return is_listed(previous['is_public'], previous['status'])
+
+@event.listens_for(db.session, 'before_flush')
+def _collect_cache_tags(session, flush_context, instances):
+    tags = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, Dream):
+            if PUBLIC_DREAMS_TAG not in tags and _affects_public_listing(session, obj):
+                tags.add(PUBLIC_DREAMS_TAG)
+        elif isinstance(obj, User) and obj.id is not None:
+            tags.add(user_cache_key(obj.id))  # 用户快照
+    if tags:
+        session.info.setdefault('cache_tags', set()).update(tags)
+
+@event.listens_for(db.session, 'after_commit')
+def _invalidate_cache_tags(session):
+    tags = session.info.pop('cache_tags', None)
+    if tags:
+        cache.invalidate_tags(*tags)
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_cache_tags(session):
+    session.info.pop('cache_tags', None)
+
+def rebuild_tag_facets():
+    """从关联表全量重建分面计数 (用于修复计数漂移)"""
+    TagFacetCount.query.delete()
+    # 使用字面量空串：绑定参数会使 SELECT 与 GROUP BY 中的表达式在 PostgreSQL 中被视为不同
+    empty = literal_column("''")
+    facet = (
+        func.coalesce(Dream.mood, empty),
+        func.coalesce(Dream.style, empty),
+        func.coalesce(Dream.blockchain, empty)
+    )
+    rows = db.session.query(dream_tag.c.tag_id, *facet, func.count()).join(
+        Dream, Dream.id == dream_tag.c.dream_id
+    ).filter(Dream.listed()).group_by(dream_tag.c.tag_id, *facet).all()
+    if rows:
+        db.session.execute(TagFacetCount.__table__.insert(), [
+            {'tag_id': tag_id, 'mood': mood, 'style': style, 'blockchain': blockchain, 'count': count}
+            for tag_id, mood, style, blockchain, count in rows
+        ])
+    db.session.commit()
+    cache.invalidate_tags(PUBLIC_DREAMS_TAG)  # 批量导入绕过了 ORM 的失效钩子
+    return len(rows)
+
+def user_cache_key(user_id):
+    return f'user:{user_id}'
+
+@login_manager.user_loader
+def load_user(user_id):
+    """返回用户快照：优先读缓存 (进程内一级缓存命中时不访问任何存储)，未命中时查询数据库"""
+    if not str(user_id).isdigit():
+        return None
+    key = user_cache_key(user_id)
+    snapshot = cache.get(key)
+    if snapshot is None:
+        user = db.session.get(User, int(user_id))
+        if user is None:
+            return None
+        snapshot = user.snapshot()
+        cache.set(key, snapshot, current_app.config['USER_SNAPSHOT_TIMEOUT'], tags=(key,))
+    return snapshot
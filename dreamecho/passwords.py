@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+密码哈希服务
+
+- 哈希与校验在有界进程池中执行，CPU 密集的 scrypt 不占用请求线程持有的 GIL
+- 同时进行的哈希/校验数量受 PASSWORD_MAX_CONCURRENT_LOGINS 限制，排队超过
+  PASSWORD_QUEUE_TIMEOUT 秒时抛出 PasswordHasherBusy，登录高峰时快速失败而不是拖慢全站
+- 未指定 PASSWORD_HASH_METHOD 时按 PASSWORD_HASH_TARGET_MS 自动校准 scrypt 成本，
+  结果保存在共享缓存中供所有 worker 使用；参数变化后用户登录时自动重新哈希
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+logger = logging.getLogger(__name__)
+
+# scrypt 成本 N 的范围：下限为 werkzeug 默认值，上限受单次哈希内存 (128 * N * r 字节) 约束
+SCRYPT_MIN_N = 2 ** 15
+SCRYPT_MAX_N = 2 ** 17
+SCRYPT_R = 8
+SCRYPT_P = 1
+METHOD_CACHE_KEY = 'password:method'
+METHOD_CACHE_TIMEOUT = 7 * 24 * 3600
+
+
+class PasswordHasherBusy(RuntimeError):
+    """同时进行的密码哈希过多"""
+
+
+def calibrate_scrypt(target_seconds):
+    """在当前机器上选择耗时不超过目标值的最大 scrypt 成本 (不低于下限)"""
+    n = SCRYPT_MIN_N
+    while n < SCRYPT_MAX_N:
+        method = f'scrypt:{n * 2}:{SCRYPT_R}:{SCRYPT_P}'
+        started = time.perf_counter()
+        generate_password_hash('calibration', method)
+        if time.perf_counter() - started > target_seconds:
+            break
+        n *= 2
+    return f'scrypt:{n}:{SCRYPT_R}:{SCRYPT_P}'
+
+
+def hash_method(pwhash):
+    """哈希值中的算法与参数部分，例如 scrypt:32768:8:1"""
+    return (pwhash or '').split('$', 1)[0]
+
+
+class PasswordHasher:
+    """进程池中的密码哈希与校验；password_hasher.init_app(app) 后使用"""
+
+    def __init__(self):
+        self.workers = 0
+        self.target_seconds = 0.25
+        self.configured_method = None
+        self.queue_timeout = 2.0
+        self._slots = threading.BoundedSemaphore(1)
+        self._method = None
+        self._pool = None
+        self._pool_pid = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        config = app.config
+        self.workers = config['PASSWORD_HASH_WORKERS']
+        self.target_seconds = config['PASSWORD_HASH_TARGET_MS'] / 1000
+        self.configured_method = config['PASSWORD_HASH_METHOD']
+        self.queue_timeout = config['PASSWORD_QUEUE_TIMEOUT']
+        self._slots = threading.BoundedSemaphore(config['PASSWORD_MAX_CONCURRENT_LOGINS'])
+        self._method = None
+        app.extensions['password_hasher'] = self
+
+    def hash(self, password):
+        """生成密码哈希"""
+        return self._run(generate_password_hash, password, self.method())
+
+    def verify(self, pwhash, password):
+        """校验密码"""
+        if not pwhash:
+            return False
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """哈希参数与当前参数不同时需要在登录成功后重新哈希"""
+        return hash_method(pwhash) != self.method()
+
+    def method(self):
+        """当前使用的哈希参数：配置值，或共享缓存中的校准结果 (没有则在进程池中校准)"""
+        if self.configured_method:
+            return self.configured_method
+        if self._method is None:
+            cache = current_app.extensions.get('dreamecho_cache')
+            method = cache.get(METHOD_CACHE_KEY) if cache is not None else None
+            if method is None:
+                method = self._run(calibrate_scrypt, self.target_seconds)
+                logger.info(f'密码哈希参数校准为 {method} (目标 {self.target_seconds * 1000:.0f} ms)')
+                if cache is not None:
+                    cache.set(METHOD_CACHE_KEY, method, METHOD_CACHE_TIMEOUT)
+            self._method = method
+        return self._method
+
+    def _executor(self):
+        """按进程创建进程池 (spawn 方式，避免 fork 带有线程的 worker)"""
+        with self._lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')
+                )
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    def _run(self, func, *args):
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise PasswordHasherBusy('当前登录请求较多，请稍后再试')
+        try:
+            if self.workers <= 0:
+                return func(*args)
+            try:
+                return self._executor().submit(func, *args).result()
+            except BrokenProcessPool:
+                logger.warning('密码哈希进程池异常退出，本次在请求线程中计算')
+                with self._lock:
+                    self._pool = None
+                return func(*args)
+        finally:
+            self._slots.release()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+请求抽样分析器 (PROFILER_ENABLED 开启，默认关闭)
+
+按 PROFILER_SAMPLE_RATE 抽取请求，或请求头 X-Profile 等于 PROFILER_TOKEN 时分析该请求：
+一个后台线程每 PROFILER_INTERVAL_MS 毫秒读取被分析线程的调用栈 (sys._current_frames)，
+请求结束后把采样结果按端点写入 PROFILER_DIR，格式为 collapsed stack (flamegraph.pl / speedscope 可直接打开)
+或 speedscope JSON；目录中只保留最近 PROFILER_MAX_FILES 个文件。管理员在 /admin/profiles 查看与下载。
+
+关闭时不注册任何钩子；开启后未抽中的请求只多一次随机数判断。
+"""
+
+import hmac
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from flask import g, request
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'X-Profile'
+FORMATS = {'collapsed': '.collapsed', 'speedscope': '.speedscope.json'}
+SAFE_NAME = re.compile(r'[^A-Za-z0-9_.-]+')
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+
+
+def frame_label(code):
+    """调用栈中一帧的名称：函数 (文件:行)，项目文件与第三方库使用相对路径"""
+    filename = code.co_filename
+    marker = filename.rfind('site-packages' + os.sep)
+    if marker >= 0:
+        filename = filename[marker + len('site-packages') + 1:]
+    elif filename.startswith(PROJECT_ROOT):
+        filename = filename[len(PROJECT_ROOT):]
+    return f'{code.co_name} ({filename}:{code.co_firstlineno})'
+
+
+def collapsed_stack(frame):
+    """从最外层到当前帧，以 ; 连接"""
+    labels = []
+    while frame is not None:
+        labels.append(frame_label(frame.f_code).replace(';', ','))
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+
+class Profile:
+    """一个请求的采样结果"""
+
+    def __init__(self, endpoint, method, path):
+        self.endpoint = endpoint
+        self.method = method
+        self.path = path
+        self.started_at = datetime.utcnow()
+        self.started = time.perf_counter()
+        self.duration = 0.0
+        self.stacks = Counter()
+
+    def collapsed(self):
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+    def speedscope(self, interval):
+        frames, index = [], {}
+        samples, weights = [], []
+        for stack, count in self.stacks.most_common():
+            sample = []
+            for label in stack.split(';'):
+                if label not in index:
+                    index[label] = len(frames)
+                    frames.append({'name': label})
+                sample.append(index[label])
+            samples.append(sample)
+            weights.append(count * interval)
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'name': f'{self.method} {self.path}',
+            'exporter': 'dreamecho.profiler',
+            'shared': {'frames': frames},
+            'profiles': [{
+                'type': 'sampled', 'name': self.endpoint, 'unit': 'seconds',
+                'startValue': 0, 'endValue': self.duration, 'samples': samples, 'weights': weights
+            }]
+        }
+
+
+class SamplingProfiler:
+    """profiler.init_app(app) 后生效；同一进程内所有被分析的请求共用一个采样线程"""
+
+    def __init__(self):
+        self.sample_rate = 0.0
+        self.interval = 0.005
+        self.token = None
+        self.directory = None
+        self.max_files = 200
+        self.format = 'collapsed'
+        self._active = {}  # 线程ID -> Profile
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._thread_pid = None
+
+    def init_app(self, app):
+        config = app.config
+        if not config['PROFILER_ENABLED']:
+            return
+        if config['PROFILER_FORMAT'] not in FORMATS:
+            raise ValueError(f"不支持的 PROFILER_FORMAT: {config['PROFILER_FORMAT']} (可选: {', '.join(FORMATS)})")
+        self.sample_rate = config['PROFILER_SAMPLE_RATE']
+        self.interval = config['PROFILER_INTERVAL_MS'] / 1000
+        self.token = config['PROFILER_TOKEN']
+        self.directory = config['PROFILER_DIR'] or os.path.join(app.instance_path, 'profiles')
+        self.max_files = config['PROFILER_MAX_FILES']
+        self.format = config['PROFILER_FORMAT']
+        app.extensions['profiler'] = self
+        app.before_request(self.start)
+        app.teardown_request(self.finish)
+
+    def requested(self):
+        """请求头携带正确的 PROFILER_TOKEN"""
+        value = request.headers.get(PROFILE_HEADER)
+        return bool(value and self.token and hmac.compare_digest(value, self.token))
+
+    def start(self):
+        if random.random() >= self.sample_rate and not self.requested():
+            return
+        profile = Profile(request.endpoint or 'unmatched', request.method, request.path)
+        g.profile = profile
+        with self._lock:
+            self._active[threading.get_ident()] = profile
+        self._ensure_thread()
+        self._wakeup.set()
+
+    def finish(self, exc=None):
+        profile = g.pop('profile', None)
+        if profile is None:
+            return
+        with self._lock:
+            self._active.pop(threading.get_ident(), None)
+        profile.duration = time.perf_counter() - profile.started
+        try:
+            self.save(profile)
+        except OSError as e:
+            logger.warning(f'保存分析结果失败: {str(e)}')
+
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is None or self._thread_pid != os.getpid() or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._sample_loop, name='profiler', daemon=True)
+                self._thread_pid = os.getpid()
+                self._thread.start()
+
+    def _sample_loop(self):
+        while True:
+            self._wakeup.wait()
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self._lock:
+                active = list(self._active.items())
+                if not self._active:
+                    self._wakeup.clear()  # 没有被分析的请求时休眠，start() 唤醒
+            for thread_id, profile in active:
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    profile.stacks[collapsed_stack(frame)] += 1
+            del frames
+
+    def save(self, profile):
+        """写入结果文件并删除超出数量的旧文件，返回文件名"""
+        if not profile.stacks:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        name = SAFE_NAME.sub('_', '{}_{}_{}ms'.format(
+            profile.started_at.strftime('%Y%m%dT%H%M%S%f'), profile.endpoint, round(profile.duration * 1000)
+        )) + FORMATS[self.format]
+        with open(os.path.join(self.directory, name), 'w', encoding='utf-8') as out:
+            if self.format == 'speedscope':
+                json.dump(profile.speedscope(self.interval), out, ensure_ascii=False)
+            else:
+                out.write(profile.collapsed())
+        for old in self.list_files()[self.max_files:]:
+            try:
+                os.remove(os.path.join(self.directory, old['name']))
+            except OSError:
+                pass
+        return name
+
+    def list_files(self):
+        """结果文件，最新的在前：[{'name', 'size', 'modified'}, ...]"""
+        try:
+            entries = [entry for entry in os.scandir(self.directory)
+                       if entry.is_file() and entry.name.endswith(tuple(FORMATS.values()))]
+        except FileNotFoundError:
+            return []
+        files = [{'name': entry.name, 'size': entry.stat().st_size,
+                  'modified': datetime.fromtimestamp(entry.stat().st_mtime)} for entry in entries]
+        return sorted(files, key=lambda item: item['name'], reverse=True)
+
+
+profiler = SamplingProfiler()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+部署配置档 (APP_PROFILE)
+
+同一份代码按配置档选择加载的蓝图、数据库与缓存、中间件：
+- full:   完整功能 (数据库、登录、梦境生成、标签推荐、模型库、管理页)
+- fast:   极简首页，不连接数据库
+- static: 完整视觉的静态首页，不连接数据库
+
+各配置档共用 dreamecho.middleware 中的响应头与压缩中间件，
+config 中的值作为该配置档的默认配置，可被 create_app(config) 覆盖。
+"""
+
+PROFILES = {
+    'full': {
+        'blueprints': ('main', 'auth', 'dreams', 'tags', 'admin', 'health'),
+        'database': True,
+        'config': {
+            'HTML_CACHE_MAX_AGE': 0,  # 页面包含登录状态，不允许共享缓存
+        },
+    },
+    'fast': {
+        'blueprints': ('landing', 'health'),
+        'database': False,
+        'config': {
+            'LANDING_TEMPLATE': 'landing_fast.html',
+            'HTML_CACHE_MAX_AGE': 300,
+        },
+    },
+    'static': {
+        'blueprints': ('landing', 'health'),
+        'database': False,
+        'config': {
+            'LANDING_TEMPLATE': 'landing_static.html',
+            'HTML_CACHE_MAX_AGE': 300,
+        },
+    },
+}
+
+
+def get_profile(name):
+    """按名称取配置档，名称无效时抛出 ValueError"""
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(f'不支持的 APP_PROFILE: {name} (可选: {", ".join(PROFILES)})') from None
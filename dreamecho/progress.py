@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+梦境生成进度 (进程内)
+"""
+
+# 全局进度跟踪字典
+# 结构: {dream_id: {'stage': 'stage_name', 'progress': percentage, 'remaining_minutes': minutes, 'status': 'status_message'}}
+dream_progress = {}
+
+# 更新进度的辅助函数
+def update_dream_progress(dream_id, stage, progress, remaining_minutes, status=None):
+    """
+    更新指定梦境ID的生成进度
+    
+    :param dream_id: 梦境ID
+    :param stage: 当前处理阶段
+    :param progress: 百分比进度 (0-100)
+    :param remaining_minutes: 预计剩余分钟数
+    :param status: 可选的状态消息
+    """
+    dream_progress[dream_id] = {
+        'stage': stage,
+        'progress': progress,
+        'remaining_minutes': remaining_minutes,
+        'status': status or "正在处理中..."
+    }
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+慢查询日志与 N+1 检测 (full 配置档)
+
+- 慢查询：耗时超过 SLOW_QUERY_MS 的语句记录警告，SELECT 附带执行计划
+  (SQLite 为 EXPLAIN QUERY PLAN，PostgreSQL 为 EXPLAIN)
+- 请求抽样：按 QUERY_INSPECT_SAMPLE_RATE 抽取请求 (开发环境可设为 1)，统计每个请求的查询；
+  同一形状的语句 (参数与 IN 列表长度不同视为相同) 在一个请求中执行不少于
+  N_PLUS_ONE_THRESHOLD 次时记为 N+1 嫌疑
+- 有嫌疑或慢查询的请求保存在本进程最近 QUERY_REPORT_SIZE 条报告中，管理员在 /admin/queries 查看汇总
+"""
+
+import logging
+import random
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from datetime import datetime
+
+from flask import g, request
+
+logger = logging.getLogger(__name__)
+
+EXPLAIN_PREFIXES = {'sqlite': 'EXPLAIN QUERY PLAN ', 'postgresql': 'EXPLAIN '}
+# 语句形状：IN (?, ?, ...) 合并为 IN (?)，数字与字符串字面量替换为 ?
+IN_LIST = re.compile(r'\(\s*(?:\?|%\(\w+\)s|%s|:\w+)(?:\s*,\s*(?:\?|%\(\w+\)s|%s|:\w+))*\s*\)')
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+WHITESPACE = re.compile(r'\s+')
+
+# 当前请求的查询记录；未抽中的请求与后台线程中为 None
+_current_trace = ContextVar('query_trace', default=None)
+
+
+def statement_shape(statement):
+    """归一化语句，用于识别重复执行的同一查询"""
+    shape = IN_LIST.sub('(?)', statement)
+    shape = LITERALS.sub('?', shape)
+    return WHITESPACE.sub(' ', shape).strip()
+
+
+class QueryTrace:
+    """一个请求中执行的查询"""
+
+    def __init__(self):
+        self.shapes = Counter()
+        self.count = 0
+        self.seconds = 0.0
+        self.slow = []
+
+    def add(self, statement, seconds):
+        self.shapes[statement_shape(statement)] += 1
+        self.count += 1
+        self.seconds += seconds
+
+
+class QueryInspector:
+    """query_inspector.init_app(app, db) 后生效"""
+
+    def __init__(self):
+        self.sample_rate = 0.0
+        self.slow_query_seconds = 0.0
+        self.explain = True
+        self.n_plus_one_threshold = 5
+        self.reports = deque(maxlen=200)
+        self._lock = threading.Lock()
+
+    def init_app(self, app, db):
+        config = app.config
+        self.sample_rate = config['QUERY_INSPECT_SAMPLE_RATE']
+        self.slow_query_seconds = config['SLOW_QUERY_MS'] / 1000
+        self.explain = config['SLOW_QUERY_EXPLAIN']
+        self.n_plus_one_threshold = config['N_PLUS_ONE_THRESHOLD']
+        self.reports = deque(maxlen=config['QUERY_REPORT_SIZE'])
+        app.extensions['query_inspector'] = self
+        if not self.sample_rate and not self.slow_query_seconds:
+            return
+
+        from sqlalchemy import event
+
+        with app.app_context():
+            for engine in db.engines.values():
+                if not event.contains(engine, 'before_cursor_execute', self._before_cursor_execute):
+                    event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+                    event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+        if self.sample_rate:
+            app.before_request(self.start_trace)
+            app.teardown_request(self.finish_trace)
+
+    def start_trace(self):
+        if random.random() < self.sample_rate:
+            trace = QueryTrace()
+            g.query_trace = trace
+            g.query_trace_token = _current_trace.set(trace)
+
+    def finish_trace(self, exc=None):
+        trace = g.pop('query_trace', None)
+        if trace is None:
+            return
+        _current_trace.reset(g.pop('query_trace_token'))
+        suspects = [
+            {'statement': shape, 'count': count}
+            for shape, count in trace.shapes.most_common() if count >= self.n_plus_one_threshold
+        ]
+        if not suspects and not trace.slow:
+            return
+        report = {
+            'time': datetime.utcnow().isoformat(timespec='seconds'),
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.endpoint or 'unmatched',
+            'queries': trace.count,
+            'db_ms': round(trace.seconds * 1000, 2),
+            'suspects': suspects,
+            'slow': trace.slow,
+        }
+        with self._lock:
+            self.reports.append(report)
+        for suspect in suspects:
+            logger.warning(
+                f"疑似 N+1 查询: {report['method']} {report['path']} 中同一语句执行 {suspect['count']} 次 "
+                f"(共 {trace.count} 次查询): {suspect['statement']}"
+            )
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('inspect_started', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get('inspect_started')
+        if not started:
+            return
+        seconds = time.perf_counter() - started.pop()
+        if conn.info.get('explaining'):
+            return
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add(statement, seconds)
+        if self.slow_query_seconds and seconds >= self.slow_query_seconds:
+            plan = self.explain_plan(conn, statement, parameters, executemany)
+            # 不记录参数 (可能包含密码哈希等敏感数据)
+            logger.warning(f'慢查询 {seconds * 1000:.1f} ms: {statement}' + (f'\n执行计划:\n{plan}' if plan else ''))
+            if trace is not None:
+                trace.slow.append({'statement': statement, 'ms': round(seconds * 1000, 2), 'plan': plan})
+
+    def explain_plan(self, conn, statement, parameters, executemany):
+        """在同一连接上取得 SELECT 的执行计划；不支持的方言或失败时返回 None"""
+        prefix = EXPLAIN_PREFIXES.get(conn.dialect.name)
+        if not self.explain or prefix is None or executemany or not statement.lstrip().upper().startswith('SELECT'):
+            return None
+        conn.info['explaining'] = True
+        try:
+            rows = conn.exec_driver_sql(prefix + statement, parameters).fetchall()
+        except Exception as e:
+            logger.debug(f'获取执行计划失败: {str(e)}')
+            return None
+        finally:
+            conn.info['explaining'] = False
+        return '\n'.join(' '.join(str(value) for value in row) for row in rows)
+
+    def summary(self):
+        """
+        按端点汇总最近的报告
+
+        :return: [{'endpoint', 'requests', 'max_queries', 'suspects': [{'statement', 'requests', 'max_count'}], 'slow'}, ...]
+        """
+        with self._lock:
+            reports = list(self.reports)
+        endpoints = {}
+        for report in reports:
+            entry = endpoints.setdefault(report['endpoint'], {
+                'endpoint': report['endpoint'], 'requests': 0, 'max_queries': 0, 'suspects': {}, 'slow': 0
+            })
+            entry['requests'] += 1
+            entry['max_queries'] = max(entry['max_queries'], report['queries'])
+            entry['slow'] += len(report['slow'])
+            for suspect in report['suspects']:
+                item = entry['suspects'].setdefault(suspect['statement'], {
+                    'statement': suspect['statement'], 'requests': 0, 'max_count': 0
+                })
+                item['requests'] += 1
+                item['max_count'] = max(item['max_count'], suspect['count'])
+        summary = sorted(endpoints.values(), key=lambda entry: entry['requests'], reverse=True)
+        for entry in summary:
+            entry['suspects'] = sorted(entry['suspects'].values(), key=lambda item: item['max_count'], reverse=True)
+        return summary
+
+    def recent_reports(self, limit=50):
+        with self._lock:
+            return list(self.reports)[-limit:][::-1]
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+请求级指标 (WSGI 中间件)
+
+包住 app.wsgi_app，按端点记录请求数、耗时 (含响应体输出)、响应大小、进行中的请求数，
+full 配置档还通过 SQLAlchemy 游标事件统计每个请求的查询次数与数据库耗时。
+指标由 /metrics 输出；端点名作为标签 (未匹配路由的请求记为 unmatched)，基数固定。
+"""
+
+import time
+from contextvars import ContextVar
+
+from flask import request
+
+from . import metrics
+
+ENDPOINT_ENVIRON_KEY = 'dreamecho.endpoint'
+UNMATCHED_ENDPOINT = 'unmatched'
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+REQUESTS = metrics.counter('dreamecho_http_requests', 'HTTP 请求数', ('endpoint', 'method', 'status'))
+REQUEST_SECONDS = metrics.histogram('dreamecho_http_request_duration_seconds', 'HTTP 请求耗时 (秒，含响应体输出)', ('endpoint',))
+RESPONSE_BYTES = metrics.histogram('dreamecho_http_response_size_bytes', 'HTTP 响应体大小 (字节)', ('endpoint',), SIZE_BUCKETS)
+IN_FLIGHT = metrics.gauge('dreamecho_http_requests_in_flight', '正在处理的 HTTP 请求数')
+REQUEST_QUERIES = metrics.histogram('dreamecho_http_request_db_queries', '每个请求的数据库查询次数', ('endpoint',), QUERY_COUNT_BUCKETS)
+REQUEST_DB_SECONDS = metrics.histogram('dreamecho_http_request_db_seconds', '每个请求的数据库耗时 (秒)', ('endpoint',))
+DB_QUERIES = metrics.counter('dreamecho_db_queries', '数据库查询数 (含后台任务)')
+DB_SECONDS = metrics.counter('dreamecho_db_query_seconds', '数据库查询累计耗时 (秒，含后台任务)')
+
+# 当前请求的数据库统计 [查询次数, 耗时]；后台线程中为 None
+_request_db_stats = ContextVar('request_db_stats', default=None)
+
+
+def init_app(app):
+    """按 METRICS_ENABLED 安装请求指标中间件"""
+    if not app.config['METRICS_ENABLED']:
+        return
+    app.before_request(record_endpoint)
+    app.wsgi_app = RequestMetricsMiddleware(app.wsgi_app)
+
+
+def record_endpoint():
+    request.environ[ENDPOINT_ENVIRON_KEY] = request.endpoint or UNMATCHED_ENDPOINT
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        started = time.perf_counter()
+        state = {'status': 500}
+        db_stats = [0, 0.0]
+        token = _request_db_stats.set(db_stats)
+        IN_FLIGHT.inc()
+
+        def metered_start_response(status, headers, exc_info=None):
+            state['status'] = int(status.split(' ', 1)[0])
+            return start_response(status, headers, exc_info)
+
+        try:
+            body = self.wsgi_app(environ, metered_start_response)
+        except BaseException:
+            IN_FLIGHT.dec()
+            _request_db_stats.reset(token)
+            self.observe(environ, state['status'], started, 0, db_stats)
+            raise
+        _request_db_stats.reset(token)
+        return MeteredBody(body, lambda size: self.observe(environ, state['status'], started, size, db_stats))
+
+    @staticmethod
+    def observe(environ, status, started, size, db_stats):
+        endpoint = environ.get(ENDPOINT_ENVIRON_KEY, UNMATCHED_ENDPOINT)
+        REQUESTS.labels(endpoint, environ.get('REQUEST_METHOD', ''), status).inc()
+        REQUEST_SECONDS.labels(endpoint).observe(time.perf_counter() - started)
+        RESPONSE_BYTES.labels(endpoint).observe(size)
+        REQUEST_QUERIES.labels(endpoint).observe(db_stats[0])
+        REQUEST_DB_SECONDS.labels(endpoint).observe(db_stats[1])
+
+
+class MeteredBody:
+    """统计输出的响应体字节数，WSGI 服务器关闭响应时记录指标"""
+
+    def __init__(self, body, on_close):
+        self.body = body
+        self.on_close = on_close
+        self.size = 0
+
+    def __iter__(self):
+        for chunk in self.body:
+            self.size += len(chunk)
+            yield chunk
+
+    def close(self):
+        try:
+            if hasattr(self.body, 'close'):
+                self.body.close()
+        finally:
+            IN_FLIGHT.dec()
+            self.on_close(self.size)
+
+
+def instrument_engines(db):
+    """为 db 的全部引擎注册游标事件，统计查询次数与耗时 (需在应用上下文中调用)"""
+    from sqlalchemy import event
+
+    for engine in db.engines.values():
+        if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+            event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('query_started')
+    if not started:
+        return
+    seconds = time.perf_counter() - started.pop()
+    DB_QUERIES.inc()
+    DB_SECONDS.inc(seconds)
+    stats = _request_db_stats.get()
+    if stats is not None:
+        stats[0] += 1
+        stats[1] += seconds
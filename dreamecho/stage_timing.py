@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+梦境生成各阶段耗时
+
+转换器用 StageTimer.span(阶段) 包住每个阶段：耗时记入 /metrics 的
+dreamecho_dream_stage_seconds 直方图，处理结束后按梦境写入 dream_stage_timing 表，
+管理页 /admin/pipeline 按天统计各阶段分位数。
+"""
+
+import logging
+import math
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from . import metrics
+from .extensions import db
+from .logging_pipeline import log_context
+from .models import DreamStageTiming
+
+logger = logging.getLogger(__name__)
+
+# 阶段按处理顺序排列
+PIPELINE_STAGES = ('probe', 'extract_keywords', 'task_create', 'poll_wait', 'download', 'post_process')
+STAGE_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300, 600)
+PERCENTILES = (50, 95, 99)
+
+STAGE_SECONDS = metrics.histogram(
+    'dreamecho_dream_stage_seconds', '梦境生成各阶段耗时 (秒)', ('stage', 'outcome'), STAGE_BUCKETS
+)
+
+
+class StageTimer:
+    """记录一个梦境各阶段的耗时"""
+
+    def __init__(self, dream_id=None):
+        self.dream_id = dream_id
+        self.spans = []
+
+    @contextmanager
+    def span(self, stage):
+        """
+        计时一个阶段；阶段内抛出异常或调用 span.fail() 时记为 error
+
+            with timer.span('task_create') as span:
+                if not task_id:
+                    span.fail()
+        """
+        span = Span(stage)
+        started = time.perf_counter()
+        try:
+            with log_context(stage=stage):
+                yield span
+        except BaseException:
+            span.fail()
+            raise
+        finally:
+            seconds = time.perf_counter() - started
+            STAGE_SECONDS.labels(stage, span.outcome).observe(seconds)
+            self.spans.append(dict(stage=stage, outcome=span.outcome, started_at=span.started_at,
+                                   duration_ms=seconds * 1000))
+
+    def save(self):
+        """写入 dream_stage_timing 并提交；写入失败只记录警告，不影响梦境处理结果"""
+        if self.dream_id is None or not self.spans:
+            return
+        try:
+            db.session.add_all(DreamStageTiming(dream_id=self.dream_id, **span) for span in self.spans)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.warning(f'梦境 {self.dream_id} 阶段耗时写入失败: {str(e)}')
+        self.spans = []
+
+
+class Span:
+    def __init__(self, stage):
+        self.stage = stage
+        self.outcome = 'ok'
+        self.started_at = datetime.utcnow()
+
+    def fail(self):
+        self.outcome = 'error'
+
+
+def percentile(sorted_values, fraction):
+    """最近秩分位数"""
+    if not sorted_values:
+        return None
+    return sorted_values[max(0, math.ceil(fraction * len(sorted_values)) - 1)]
+
+
+def stage_percentiles(days=7):
+    """
+    最近 days 天各阶段耗时分位数 (只统计成功的阶段)
+
+    :return: [{'day': 'YYYY-MM-DD', 'stage', 'count', 'errors', 'p50', 'p95', 'p99'}, ...]，按日期倒序、阶段顺序排列
+    """
+    since = datetime.utcnow() - timedelta(days=days)
+    rows = db.session.query(
+        DreamStageTiming.started_at, DreamStageTiming.stage, DreamStageTiming.outcome, DreamStageTiming.duration_ms
+    ).filter(DreamStageTiming.started_at >= since).all()
+
+    durations = defaultdict(list)
+    errors = defaultdict(int)
+    for started_at, stage, outcome, duration_ms in rows:
+        key = (started_at.date().isoformat(), stage)
+        if outcome == 'ok':
+            durations[key].append(duration_ms)
+        else:
+            errors[key] += 1
+
+    order = {stage: index for index, stage in enumerate(PIPELINE_STAGES)}
+    keys = sorted(set(durations) | set(errors), key=lambda key: (key[0], -order.get(key[1], len(order))), reverse=True)
+    report = []
+    for day, stage in keys:
+        values = sorted(durations[(day, stage)])
+        entry = {'day': day, 'stage': stage, 'count': len(values), 'errors': errors[(day, stage)]}
+        for p in PERCENTILES:
+            entry[f'p{p}'] = percentile(values, p / 100)
+        report.append(entry)
+    return report
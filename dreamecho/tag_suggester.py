@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地标签推荐
+
+根据已有梦境的描述与 标签/关键词 建立倒排索引，在进程内为新的梦境描述推荐标签，
+不调用 DeepSeek。中文按字符 n-gram 切分，英文按单词切分。
+
+索引以不可变快照的形式保存，后台线程增量构建新快照后整体替换引用，
+查询线程无需加锁。首次构建同样在后台线程中进行，完成前返回默认标签。
+"""
+
+import math
+import re
+import threading
+import time
+from collections import Counter
+
+CJK_RUN = re.compile(r'[\u3400-\u9fff\uf900-\ufaff]+')
+WORD = re.compile(r'[a-z0-9]+')
+
+INDEX_NGRAMS = (2, 3)  # 建索引用的中文 n-gram 长度
+MATCH_NGRAMS = (1, 2, 3, 4)  # 直接匹配已有标签名时的 n-gram 长度
+MAX_QUERY_LENGTH = 2000  # 查询文本截断长度，保证响应时间有上界
+
+
+def tokenize(text, ngram_sizes=INDEX_NGRAMS):
+    """将文本切分为词项：中文取字符 n-gram，英文取小写单词"""
+    text = (text or '').lower()
+    terms = WORD.findall(text)
+    for run in CJK_RUN.findall(text):
+        for size in ngram_sizes:
+            if len(run) < size:
+                continue
+            terms.extend(run[i:i + size] for i in range(len(run) - size + 1))
+    return terms
+
+
+class TagIndex:
+    """标签倒排索引快照 (构建后只读)"""
+
+    def __init__(self, postings=None, doc_freq=None, tag_freq=None, doc_count=0, last_id=0):
+        self.postings = postings or {}  # 词项 -> {标签: 共现次数}
+        self.doc_freq = doc_freq or {}  # 词项 -> 文档频次
+        self.tag_freq = tag_freq or {}  # 标签 -> 出现次数
+        self.doc_count = doc_count
+        self.last_id = last_id  # 已索引的最大梦境ID
+
+    def extend(self, documents):
+        """返回加入新文档后的新快照；只复制受影响词项的倒排表"""
+        postings = dict(self.postings)
+        doc_freq = dict(self.doc_freq)
+        tag_freq = dict(self.tag_freq)
+        doc_count = self.doc_count
+        last_id = self.last_id
+        touched = set()
+
+        for doc_id, text, labels in documents:
+            last_id = max(last_id, doc_id)
+            labels = [label for label in dict.fromkeys(labels) if label]
+            if not labels:
+                continue
+            doc_count += 1
+            for label in labels:
+                tag_freq[label] = tag_freq.get(label, 0) + 1
+            # 标签本身也作为文本参与索引，使其名称能召回自己
+            for term in set(tokenize(' '.join([text or ''] + labels))):
+                doc_freq[term] = doc_freq.get(term, 0) + 1
+                if term not in touched:
+                    postings[term] = dict(postings.get(term, {}))
+                    touched.add(term)
+                posting = postings[term]
+                for label in labels:
+                    posting[label] = posting.get(label, 0) + 1
+
+        return TagIndex(postings, doc_freq, tag_freq, doc_count, last_id)
+
+    def suggest(self, text, limit=6, exclude=()):
+        """为文本推荐标签，按 TF-IDF 加权的共现得分排序"""
+        text = (text or '')[:MAX_QUERY_LENGTH]
+        if not self.doc_count or not text.strip():
+            return []
+
+        scores = Counter()
+        for term, tf in Counter(tokenize(text)).items():
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            idf = math.log((self.doc_count + 1) / self.doc_freq[term])
+            # 罕见词项的倒排表短、权重高；高频词项只取少量贡献
+            weight = tf * idf / len(posting)
+            for label, count in posting.items():
+                scores[label] += weight * count
+
+        # 描述中直接出现的已有标签名额外加分
+        for term in set(tokenize(text, MATCH_NGRAMS)):
+            if term in self.tag_freq:
+                scores[term] += 10.0
+
+        excluded = set(exclude)
+        return [label for label, _ in scores.most_common(limit + len(excluded))
+                if label not in excluded][:limit]
+
+
+class TagSuggester:
+    """带后台增量刷新的标签推荐器"""
+
+    def __init__(self, loader, default_tags=(), refresh_interval=60, full_rebuild_interval=3600, logger=None):
+        """
+        :param loader: loader(after_id) -> 可迭代的 (梦境ID, 文本, 标签列表)，只返回ID大于 after_id 的梦境
+        :param default_tags: 索引为空或无匹配时返回的标签
+        :param refresh_interval: 增量刷新间隔(秒)
+        :param full_rebuild_interval: 全量重建间隔(秒)，用于纳入已有梦境的标签修改
+        """
+        self.loader = loader
+        self.default_tags = list(default_tags)
+        self.refresh_interval = refresh_interval
+        self.full_rebuild_interval = full_rebuild_interval
+        self.logger = logger
+        self.index = TagIndex()
+        self._last_full_rebuild = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def suggest(self, text, limit=6):
+        """推荐标签；结果不足时用默认标签补齐"""
+        tags = self.index.suggest(text, limit)
+        if len(tags) < limit:
+            tags += [tag for tag in self.default_tags if tag not in tags][:limit - len(tags)]
+        return tags
+
+    def refresh(self, full=False):
+        """增量(或全量)刷新索引，构建完成后替换快照"""
+        with self._lock:
+            base = TagIndex() if full else self.index
+            self.index = base.extend(self.loader(base.last_id))
+            if full:
+                self._last_full_rebuild = time.monotonic()
+        return self.index
+
+    def ensure_started(self):
+        """首次使用时启动后台线程 (先全量构建索引，再定期刷新)，不阻塞当前请求"""
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name='tag-suggester', daemon=True)
+            self._thread.start()
+
+    def _safe_refresh(self, full):
+        try:
+            self.refresh(full=full)
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f'标签索引刷新失败: {str(e)}')
+
+    def _run(self):
+        self._safe_refresh(full=True)
+        while True:
+            time.sleep(self.refresh_interval)
+            full = time.monotonic() - self._last_full_rebuild >= self.full_rebuild_interval
+            self._safe_refresh(full)
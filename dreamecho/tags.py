@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+标签推荐与标签分面统计
+"""
+
+from functools import partial
+
+from flask import Blueprint, current_app, jsonify, request
+from sqlalchemy import func
+
+from .cache import cache_key
+from .database import use_replica
+from .dreams import dream_filter_args, load_json_list
+from .extensions import cache, db
+from .models import PUBLIC_DREAMS_TAG, Dream, Tag, TagFacetCount, parse_tags
+from .tag_suggester import TagSuggester
+
+bp = Blueprint('tags', __name__)
+
+def load_tag_corpus(app, after_id, batch_size=500):
+    """按ID顺序分批读取梦境文本及其 标签/关键词，供本地标签索引使用"""
+    with app.app_context():
+        while True:
+            dreams = Dream.query.filter(Dream.id > after_id).order_by(Dream.id).limit(batch_size).all()
+            if not dreams:
+                return
+            for dream in dreams:
+                text = ' '.join(filter(None, [dream.title, dream.description or dream.dream_text]))
+                yield dream.id, text, parse_tags(dream.tag_names + load_json_list(dream.keywords))
+            after_id = dreams[-1].id
+
+def init_tag_suggester(app):
+    """为应用创建进程内标签推荐器：首次请求时启动后台线程构建索引 (完成前返回默认标签)，之后增量刷新"""
+    app.extensions['tag_suggester'] = TagSuggester(
+        partial(load_tag_corpus, app),
+        default_tags=['梦境', '飞翔', '自由', '探索', '冒险', '奇幻'],
+        refresh_interval=app.config['TAG_SUGGEST_REFRESH_INTERVAL'],
+        full_rebuild_interval=app.config['TAG_SUGGEST_FULL_REBUILD_INTERVAL'],
+        logger=app.logger
+    )
+
+@bp.route('/api/generate_tags', methods=['POST'])
+def generate_tags():
+    """根据梦境描述在本地推荐标签 (不调用 DeepSeek)"""
+    data = request.get_json(silent=True) or {}
+    description = data.get('description') or ''
+    try:
+        limit = max(1, min(int(data.get('limit', 6)), 20))
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'error': 'limit 必须是整数'}), 400
+
+    tag_suggester = current_app.extensions['tag_suggester']
+    tag_suggester.ensure_started()
+    tags = tag_suggester.suggest(description, limit)
+    
+    return jsonify({
+        'success': True,
+        'tags': tags
+    })
+
+@bp.route('/api/tags/facets')
+@use_replica
+def api_tag_facets():
+    """API: 当前筛选条件下各标签的公开梦境数量 (结果缓存，梦境写入后失效)"""
+    limit = min(request.args.get('limit', 30, type=int), 100)
+    filters = dream_filter_args()
+
+    key = cache_key('api:tag_facets', limit=limit, **filters)
+    facets = cache.remember(key, lambda: tag_facet_counts(filters, limit), tags=(PUBLIC_DREAMS_TAG,))
+
+    return jsonify({
+        'success': True,
+        'filters': filters,
+        'facets': facets
+    })
+
+def tag_facet_counts(filters, limit):
+    """按筛选条件汇总各标签的公开梦境数量"""
+    total = func.sum(TagFacetCount.count)
+    query = db.session.query(Tag.name, total).join(TagFacetCount, TagFacetCount.tag_id == Tag.id)
+    for field, value in filters.items():
+        if value:
+            query = query.filter(getattr(TagFacetCount, field) == value)
+    rows = query.group_by(Tag.id, Tag.name).having(total > 0).order_by(total.desc(), Tag.name).limit(limit).all()
+    return [{'tag': name, 'count': int(count)} for name, count in rows]
@@ -0,0 +1,120 @@
+"""normalize dream tags into tag / dream_tag with facet counts
+
+Revision ID: 3f1c2a7d9b64
+Revises: 9a38ac172975
+Create Date: 2026-10-19 10:12:40.318224
+
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a7d9b64'
+down_revision = '9a38ac172975'
+branch_labels = None
+depends_on = None
+
+# 与 dreamecho.models.parse_tags 保持一致 (迁移中不导入应用代码)
+TAG_SEPARATORS = re.compile(r'[,，、;；\n]+')
+MAX_TAG_LENGTH = 50
+
+
+def parse_tags(raw_tags):
+    names = []
+    for raw in TAG_SEPARATORS.split(raw_tags or ''):
+        name = raw.strip().lower()[:MAX_TAG_LENGTH]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def upgrade():
+    with op.batch_alter_table('dream', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('mood', sa.String(length=50), nullable=True))
+        batch_op.add_column(sa.Column('style', sa.String(length=50), nullable=True))
+        batch_op.add_column(sa.Column('is_public', sa.Boolean(), nullable=True))
+
+    op.create_table('tag',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_tag_name', 'tag', ['name'], unique=True)
+
+    op.create_table('dream_tag',
+    sa.Column('dream_id', sa.Integer(), nullable=False),
+    sa.Column('tag_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['dream_id'], ['dream.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['tag_id'], ['tag.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('dream_id', 'tag_id')
+    )
+    op.create_index('ix_dream_tag_tag_id_dream_id', 'dream_tag', ['tag_id', 'dream_id'], unique=False)
+
+    op.create_table('tag_facet_count',
+    sa.Column('tag_id', sa.Integer(), nullable=False),
+    sa.Column('mood', sa.String(length=50), nullable=False),
+    sa.Column('style', sa.String(length=50), nullable=False),
+    sa.Column('blockchain', sa.String(length=50), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['tag_id'], ['tag.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('tag_id', 'mood', 'style', 'blockchain')
+    )
+    op.create_index('ix_tag_facet_count_filters', 'tag_facet_count', ['mood', 'style', 'blockchain'], unique=False)
+
+    backfill_tags()
+
+
+def backfill_tags():
+    """从 dream.tags 文本列回填规范化标签与分面计数"""
+    bind = op.get_bind()
+    dream_columns = {column['name'] for column in sa.inspect(bind).get_columns('dream')}
+    if 'tags' not in dream_columns:
+        return
+
+    dream = sa.table('dream', *[sa.column(name) for name in ('id', 'tags', 'mood', 'style', 'blockchain', 'is_public')
+                                if name in dream_columns])
+    tag = sa.Table('tag', sa.MetaData(),
+                   sa.Column('id', sa.Integer(), primary_key=True),
+                   sa.Column('name', sa.String(length=50)))
+    dream_tag = sa.table('dream_tag', sa.column('dream_id'), sa.column('tag_id'))
+    tag_facet_count = sa.table('tag_facet_count', sa.column('tag_id'), sa.column('mood'),
+                               sa.column('style'), sa.column('blockchain'), sa.column('count'))
+
+    tag_ids = {}
+    links = []
+    counts = {}
+    rows = bind.execute(sa.select(dream).where(dream.c.tags.isnot(None))).mappings().all()
+    for row in rows:
+        facet = (row.get('mood') or '', row.get('style') or '', row.get('blockchain') or '')
+        for name in parse_tags(row['tags']):
+            if name not in tag_ids:
+                tag_ids[name] = bind.execute(tag.insert().values(name=name)).inserted_primary_key[0]
+            links.append({'dream_id': row['id'], 'tag_id': tag_ids[name]})
+            if row.get('is_public') is not False:
+                key = (tag_ids[name],) + facet
+                counts[key] = counts.get(key, 0) + 1
+
+    if links:
+        op.bulk_insert(dream_tag, links)
+    if counts:
+        op.bulk_insert(tag_facet_count, [
+            {'tag_id': tag_id, 'mood': mood, 'style': style, 'blockchain': blockchain, 'count': count}
+            for (tag_id, mood, style, blockchain), count in counts.items()
+        ])
+
+
+def downgrade():
+    op.drop_index('ix_tag_facet_count_filters', table_name='tag_facet_count')
+    op.drop_table('tag_facet_count')
+    op.drop_index('ix_dream_tag_tag_id_dream_id', table_name='dream_tag')
+    op.drop_table('dream_tag')
+    op.drop_index('ix_tag_name', table_name='tag')
+    op.drop_table('tag')
+
+    with op.batch_alter_table('dream', schema=None) as batch_op:
+        batch_op.drop_column('is_public')
+        batch_op.drop_column('style')
+        batch_op.drop_column('mood')
@@ -0,0 +1,37 @@
+"""add dream_stage_timing for per-stage pipeline latency
+
+Revision ID: d41f8e2b6c90
+Revises: b7e4d0c5a812
+Create Date: 2026-10-19 15:20:37.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd41f8e2b6c90'
+down_revision = 'b7e4d0c5a812'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('dream_stage_timing',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('dream_id', sa.Integer(), nullable=False),
+    sa.Column('stage', sa.String(length=32), nullable=False),
+    sa.Column('outcome', sa.String(length=16), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=False),
+    sa.Column('duration_ms', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['dream_id'], ['dream.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_dream_stage_timing_dream_id', 'dream_stage_timing', ['dream_id'], unique=False)
+    op.create_index('ix_dream_stage_timing_started_at_stage', 'dream_stage_timing', ['started_at', 'stage'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_dream_stage_timing_started_at_stage', table_name='dream_stage_timing')
+    op.drop_index('ix_dream_stage_timing_dream_id', table_name='dream_stage_timing')
+    op.drop_table('dream_stage_timing')
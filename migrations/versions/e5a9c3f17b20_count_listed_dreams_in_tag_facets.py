@@ -0,0 +1,57 @@
+"""count only listed dreams (public and complete/minting/minted) in tag facets
+
+Revision ID: e5a9c3f17b20
+Revises: d41f8e2b6c90
+Create Date: 2026-10-19 16:05:12.482913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a9c3f17b20'
+down_revision = 'd41f8e2b6c90'
+branch_labels = None
+depends_on = None
+
+LISTED_STATUSES = ('complete', 'minting', 'minted')
+
+
+def rebuild_counts(listed_only):
+    dream = sa.table('dream', sa.column('id'), sa.column('mood'), sa.column('style'),
+                     sa.column('blockchain'), sa.column('is_public'), sa.column('status'))
+    dream_tag = sa.table('dream_tag', sa.column('dream_id'), sa.column('tag_id'))
+    tag_facet_count = sa.table('tag_facet_count', sa.column('tag_id'), sa.column('mood'),
+                               sa.column('style'), sa.column('blockchain'), sa.column('count'))
+
+    condition = sa.or_(dream.c.is_public.is_(None), dream.c.is_public.is_(True))
+    if listed_only:
+        condition = sa.and_(condition, dream.c.status.in_(LISTED_STATUSES))
+    empty = sa.literal_column("''")
+    facet = (
+        sa.func.coalesce(dream.c.mood, empty),
+        sa.func.coalesce(dream.c.style, empty),
+        sa.func.coalesce(dream.c.blockchain, empty)
+    )
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(dream_tag.c.tag_id, *facet, sa.func.count())
+        .select_from(dream_tag.join(dream, dream.c.id == dream_tag.c.dream_id))
+        .where(condition)
+        .group_by(dream_tag.c.tag_id, *facet)
+    ).all()
+    bind.execute(tag_facet_count.delete())
+    if rows:
+        op.bulk_insert(tag_facet_count, [
+            {'tag_id': tag_id, 'mood': mood, 'style': style, 'blockchain': blockchain, 'count': count}
+            for tag_id, mood, style, blockchain, count in rows
+        ])
+
+
+def upgrade():
+    rebuild_counts(listed_only=True)
+
+
+def downgrade():
+    rebuild_counts(listed_only=False)